@@ -1,9 +1,12 @@
 from .genetic import *
 from .heightmap import *
 from .maps import *
+from .geometry import *
+from .threat import *
+from .spatial import *
 
-def build_random_map(percentage: float, rows: int, cols: int) -> LandMap:
-    generator = GAT_Generator(percentage, (rows, cols))
+def build_random_map(percentage: float, rows: int, cols: int, seed=None) -> LandMap:
+    generator = GAT_Generator(percentage, (rows, cols), seed=seed)
     hm = generator()
 
     passable = hm.__map__ * 10
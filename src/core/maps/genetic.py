@@ -3,8 +3,8 @@ from typing import List, Tuple
 from numpy.core.fromnumeric import mean
 from .heightmap import HeightMap
 from numpy import sum, array, vectorize, zeros, linspace, meshgrid
-from random import randint, sample
 from perlin_noise import PerlinNoise
+from ...utils.rng import RandomStreams, MAP
 
 class GAT_Generator:
     @property
@@ -18,8 +18,11 @@ class GAT_Generator:
                  poblation_size=7,
                  iter=100,
                  merge_weight=0.95,
-                 tol=0.03):
+                 tol=0.03,
+                 seed=None):
         self.percentage = percentage
+        streams = seed if isinstance(seed, RandomStreams) else RandomStreams(seed)
+        self.__rng__ = streams.numpy(MAP)
 
         self.__shape__ = shape
         self.__poblation_size__ = poblation_size
@@ -76,7 +79,7 @@ class GAT_Generator:
         return per if per < self.percentage else 0
 
     def __generate_member(self) -> HeightMap:
-        noise = PerlinNoise(octaves=2, seed=randint(0, 1024))
+        noise = PerlinNoise(octaves=2, seed=int(self.__rng__.integers(0, 1025)))
 
         world = zeros(self.__shape__)
 
@@ -104,7 +107,7 @@ class GAT_Generator:
 
     def _selection(self) -> Tuple[HeightMap, HeightMap]:
         # Seleccion competitiva
-        index = sample(range(0, self.__poblation_size__), 4)
+        index = self.__rng__.choice(self.__poblation_size__, 4, replace=False)
         tournment = self.poblation[index]
         fitness = self.__fitness__[index]
 
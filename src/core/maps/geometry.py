@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import Tuple
+from numpy import array, int64
+
+# mayor distancia que recorre una unidad en un turno: el recorrido de los vecinos desplaza la
+# ventana de columnas con la celda elegida, por lo que puede terminar hasta tres columnas mas alla
+MAX_STEP = 3
+
+
+# Desplazamientos de los anillos de Chebyshev entre min_range y max_range, en el mismo orden en
+# que los recorren las unidades: por cada distancia k la fila de arriba, la de abajo, la columna
+# izquierda y la derecha. Se calculan una vez por par de rangos.
+@lru_cache(maxsize=None)
+def ring_offsets(min_range: int, max_range: int) -> Tuple:
+    rows = []
+    cols = []
+    for k in range(min_range, max_range + 1):
+        if k == 0:
+            rows.append(0)
+            cols.append(0)
+            continue
+        for j in range(-k, k + 1):
+            rows.append(-k)
+            cols.append(j)
+        for j in range(-k, k + 1):
+            rows.append(k)
+            cols.append(j)
+        for i in range(-k + 1, k):
+            rows.append(i)
+            cols.append(-k)
+        for i in range(-k + 1, k):
+            rows.append(i)
+            cols.append(k)
+    rows = array(rows, dtype=int64)
+    cols = array(cols, dtype=int64)
+    rows.flags.writeable = False
+    cols.flags.writeable = False
+    return rows, cols
+
+
+# celdas de los anillos alrededor de (row, col) que caen dentro del mapa
+def ring_cells(row: int, col: int, min_range: int, max_range: int, no_rows: int,
+               no_columns: int) -> Tuple:
+    rows, cols = ring_offsets(min_range, max_range)
+    rows = rows + row
+    cols = cols + col
+    inside = (rows >= 0) & (rows < no_rows) & (cols >= 0) & (cols < no_columns)
+    return rows[inside], cols[inside]
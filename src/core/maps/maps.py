@@ -1,9 +1,17 @@
-from abc import ABC, abstractclassmethod
+from abc import ABC, abstractmethod
 from typing import List
+from numpy import array, full, int64, float64
+
+# valores de la rejilla de bandos que no son el id de un bando
+EMPTY = -1
+OBJECT = -2
+NO_SIDE = -3
 
 class Cell:
 
     def __init__(self, passable : float, type : str, row : int, column: int, height: float):
+        # mapa al que pertenece la celda, lo asigna el mapa
+        self.land = None
         self.passable = passable
         self.type = type
         self.row = row
@@ -11,6 +19,14 @@ class Cell:
         self.height = height
         self.bs_object = None
         
+    # El objeto de una celda de un mapa se cambia a traves del mapa, asi las rejillas de ocupacion
+    # y los observadores siguen al dia aunque el codigo de una unidad (por ejemplo un move_to_cell
+    # redefinido en BattleScript) asigne bs_object directamente.
+    def __setattr__(self, name, value):
+        if name == "bs_object" and self.land is not None:
+            self.land.assign(self, value)
+        object.__setattr__(self, name, value)
+
     def __hash__(self):
         return hash(f'{self.row} {self.col}')
     
@@ -19,6 +35,11 @@ class Cell:
             return self.row == o.row and self.col == o.col
         return False
 
+    # la posicion va en los argumentos para que el hash exista antes de restaurar el resto del
+    # estado, ya que las celdas se guardan en conjuntos que forman ciclos con las unidades
+    def __reduce__(self):
+        return Cell, (self.passable, self.type, self.row, self.col, self.height), self.__dict__
+
     def __str__(self):
         return f"({self.row}, {self.col})"
     
@@ -27,19 +48,86 @@ class Cell:
 
 class Map(ABC):
 
-    @abstractclassmethod
+    @abstractmethod
     def __init__(self, no_rows : int, no_columns:int):
         self.no_rows = no_rows
         self.no_columns = no_columns
         self.matrix = None
+        # rejillas de ocupacion: id del objeto y bando de cada celda
+        self.occupancy = full((no_rows, no_columns), EMPTY, int64)
+        self.side_grid = full((no_rows, no_columns), EMPTY, int64)
+        # objetos que escuchan los cambios de ocupacion (on_place, on_vacate y clear)
+        self.observers = []
+        # rejillas del terreno (transitabilidad, altura y tipo), se construyen desde las celdas
+        # la primera vez que se piden
+        self.terrain_grids = None
 
     def __getitem__(self, i):
         return self.matrix[i]
 
+    # asociar las celdas de la matriz al mapa, despues de construirla
+    def attach(self):
+        for row in self.matrix:
+            for cell in row:
+                cell.land = self
+
+    def terrain(self):
+        if self.terrain_grids is None:
+            self.terrain_grids = (
+                array([[cell.passable for cell in row] for row in self.matrix], dtype=float64),
+                array([[cell.height for cell in row] for row in self.matrix], dtype=float64),
+                array([[cell.type for cell in row] for row in self.matrix])
+            )
+        return self.terrain_grids
+
+    # poner un objeto en una celda
+    def place(self, bs_object, row: int, col: int):
+        self.matrix[row][col].bs_object = bs_object
+
+    # vaciar una celda
+    def vacate(self, row: int, col: int):
+        self.matrix[row][col].bs_object = None
+
+    # actualizar las rejillas y avisar a los observadores antes de que cambie el objeto de una
+    # celda; lo llama la celda al asignarle bs_object
+    def assign(self, cell, bs_object):
+        row, col = cell.row, cell.col
+        old = cell.bs_object
+        if old is not None:
+            self.occupancy[row, col] = EMPTY
+            self.side_grid[row, col] = EMPTY
+            for observer in self.observers:
+                observer.on_vacate(old, row, col)
+        if bs_object is not None:
+            self.occupancy[row, col] = bs_object.id
+            self.side_grid[row, col] = bs_object.grid_side()
+            for observer in self.observers:
+                observer.on_place(bs_object, row, col)
+
+    # mover un objeto de su celda a otra
+    def move(self, bs_object, cell):
+        self.vacate(bs_object.cell.row, bs_object.cell.col)
+        self.place(bs_object, cell.row, cell.col)
+
+    # reconstruir las rejillas a partir de las celdas, por ejemplo si cambio el bando de una unidad
+    def refresh_occupancy(self):
+        self.occupancy.fill(EMPTY)
+        self.side_grid.fill(EMPTY)
+        for observer in self.observers:
+            observer.clear()
+        for row in self.matrix:
+            for cell in row:
+                if cell.bs_object is not None:
+                    self.occupancy[cell.row, cell.col] = cell.bs_object.id
+                    self.side_grid[cell.row, cell.col] = cell.bs_object.grid_side()
+                    for observer in self.observers:
+                        observer.on_place(cell.bs_object, cell.row, cell.col)
+
 
 class LandMap(Map):
 
     def __init__(self, no_rows, no_columns, passable_map, height_map, sea_height):
-        Map.__init__(no_rows, no_columns)
+        Map.__init__(self, no_rows, no_columns)
         self.matrix = [[Cell(passable_map[i][j], "earth" if height_map[i][j] > sea_height else "water",
                              i, j, height_map[i][j]) for j in range(no_columns)] for i in range(no_rows)]
+        self.attach()
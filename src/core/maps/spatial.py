@@ -0,0 +1,35 @@
+from typing import List
+from numpy import array, full, minimum, inf, float64, int64
+from scipy.spatial import cKDTree
+
+
+# Indice espacial de las unidades vivas de cada bando, construido una vez por turno. Las
+# distancias son de Chebyshev (p=inf), la misma que usan las unidades para sus rangos.
+class SpatialIndex:
+
+    def __init__(self, sides: List):
+        self.trees = {}
+        self.units = {}
+        for side in sides:
+            units = [unit for unit in side.alive_units if unit.cell is not None]
+            if units:
+                positions = array([(unit.cell.row, unit.cell.col) for unit in units], dtype=int64)
+                self.trees[side.id] = cKDTree(positions)
+                self.units[side.id] = units
+
+    # distancia al enemigo mas cercano de cada unidad del bando, en una consulta por bando enemigo
+    def nearest_enemy(self, side_id: int, positions):
+        distances = full(len(positions), inf, float64)
+        if not len(positions):
+            return distances
+        for id, tree in self.trees.items():
+            if id != side_id:
+                distances = minimum(distances, tree.query(positions, p=inf)[0])
+        return distances
+
+    # asigna a cada unidad viva la distancia a su enemigo mas cercano
+    def update_enemy_distances(self):
+        for side_id, units in self.units.items():
+            positions = self.trees[side_id].data
+            for unit, distance in zip(units, self.nearest_enemy(side_id, positions).tolist()):
+                unit.enemy_distance = distance
@@ -0,0 +1,41 @@
+from numpy import zeros, int32
+from .maps import OBJECT
+
+
+# Mapa de amenaza de un bando: para cada celda, cuantas unidades enemigas la tienen entre su
+# rango minimo y maximo. Se mantiene de forma incremental escuchando los cambios del mapa.
+class ThreatMap:
+
+    def __init__(self, map, side_id: int):
+        self.side_id = side_id
+        self.grid = zeros((map.no_rows, map.no_columns), int32)
+        # mayor alcance de los enemigos que se han contado
+        self.max_reach = 0
+
+    def __getitem__(self, index):
+        return self.grid[index]
+
+    def is_enemy(self, bs_object) -> bool:
+        side = bs_object.grid_side()
+        return side != OBJECT and side != self.side_id
+
+    # sumar (o restar) la zona de alcance de una unidad en (row, col)
+    def update(self, row: int, col: int, min_range: int, max_range: int, sign: int):
+        self.grid[max(row - max_range, 0):row + max_range + 1,
+                  max(col - max_range, 0):col + max_range + 1] += sign
+        if min_range > 0:
+            self.grid[max(row - min_range + 1, 0):row + min_range,
+                      max(col - min_range + 1, 0):col + min_range] -= sign
+
+    def on_place(self, bs_object, row: int, col: int):
+        if self.is_enemy(bs_object):
+            self.update(row, col, bs_object.min_range, bs_object.max_range, 1)
+            self.max_reach = max(self.max_reach, bs_object.max_range)
+
+    def on_vacate(self, bs_object, row: int, col: int):
+        if self.is_enemy(bs_object):
+            self.update(row, col, bs_object.min_range, bs_object.max_range, -1)
+
+    def clear(self):
+        self.grid.fill(0)
+        self.max_reach = 0
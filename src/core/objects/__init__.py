@@ -1,2 +1,3 @@
 from .base_objects import *
-from .units import *
\ No newline at end of file
+from .units import *
+from .store import *
\ No newline at end of file
@@ -3,6 +3,10 @@ from ..maps import *
 
 
 class BSObject(ABC):
+    # Golpes del ataque que se esta aplicando: (id, puntos de vida perdidos, puntos de vida
+    # restantes) de cada objeto alcanzado, o None fuera de un ataque. Lo abre BSUnit.apply y lo
+    # llena take_damage, asi no depende de lo que devuelva un attack_enemy redefinido.
+    hits = None
 
     @abstractmethod
     def __init__(self, id: int, life_points: int, defense: int):
@@ -19,16 +23,27 @@ class BSObject(ABC):
         else:
             if map[row][col].bs_object != None:
                 raise Exception("Busy cell")
-            map[row][col].bs_object = self
+            map.place(self, row, col)
             self.map = map
             self.cell = map[row][col]
 
     # tomar danio
     def take_damage(self, damage: float):
+        life_points = self.life_points
         self.life_points -= damage / self.defense
         if self.life_points <= 0:
             self.life_points = 0
-            self.cell.bs_object = None
+            self.map.vacate(self.cell.row, self.cell.col)
+        self.record_hit(life_points)
+
+    # anotar el golpe en el ataque en curso, si hay uno
+    def record_hit(self, life_points: float):
+        if BSObject.hits is not None:
+            BSObject.hits.append((self.id, life_points - self.life_points, self.life_points))
+
+    # valor del objeto en la rejilla de bandos del mapa
+    def grid_side(self) -> int:
+        return OBJECT
 
 
 class StaticObject(BSObject):
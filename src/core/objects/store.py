@@ -0,0 +1,158 @@
+from numpy import zeros, float64, int64
+
+# columnas numericas del almacen y su tipo
+COLUMNS = {
+    "life_points": float64,
+    "defense": float64,
+    "attack": float64,
+    "moral": float64,
+    "ofensive": float64,
+    "intelligence": float64,
+    "min_range": int64,
+    "max_range": int64,
+    "radio": int64,
+    "vision": int64,
+    "recharge_turns": int64,
+    "turns_recharging": int64,
+}
+
+# columnas derivadas de la celda y el bando de la unidad
+POSITION = ("row", "col", "side")
+
+
+# atributo de la unidad guardado en una columna del almacen
+class Column:
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        return unit._store.columns[self.name].item(unit._row)
+
+    def __set__(self, unit, value):
+        unit._store.columns[self.name][unit._row] = value
+
+
+# la celda se guarda como objeto y ademas como fila y columna en el almacen
+class CellColumn:
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        return unit.__dict__["cell"]
+
+    def __set__(self, unit, cell):
+        unit.__dict__["cell"] = cell
+        columns = unit._store.columns
+        columns["row"][unit._row] = cell.row if cell is not None else -1
+        columns["col"][unit._row] = cell.col if cell is not None else -1
+
+
+# el bando se guarda como objeto y ademas como id en el almacen
+class SideColumn:
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        return unit.__dict__["side"]
+
+    def __set__(self, unit, side):
+        unit.__dict__["side"] = side
+        unit._store.columns["side"][unit._row] = side.id if side is not None else -1
+
+
+# atributos de una unidad con los valores de las columnas del almacen en vez de su fila
+def unit_state(unit) -> dict:
+    state = {key: value for key, value in unit.__dict__.items() if key not in ("_store", "_row")}
+    if getattr(unit, "_store", None) is not None:
+        for name in COLUMNS:
+            state[name] = getattr(unit, name)
+    return state
+
+
+# clase original de una unidad, aunque sea una vista del almacen
+def base_class(unit):
+    cls = type(unit)
+    return cls.__bases__[0] if cls in _VIEWS.values() else cls
+
+
+# instancia sin inicializar de cls, los atributos se asignan despues
+def new_unit(cls):
+    return cls.__new__(cls)
+
+
+# Una vista se copia y se serializa como una instancia de la clase original con los valores de
+# su fila, sin el almacen: la clase de la vista no se puede importar por nombre.
+def _reduce_view(unit, protocol):
+    return new_unit, (base_class(unit),), unit_state(unit)
+
+
+_VIEWS = {}
+
+
+# subclase de cls cuyos atributos numericos son vistas sobre una fila del almacen
+def view_class(cls):
+    view = _VIEWS.get(cls)
+    if view is None:
+        namespace = {name: Column(name) for name in COLUMNS}
+        namespace["cell"] = CellColumn()
+        namespace["side"] = SideColumn()
+        namespace["__reduce_ex__"] = _reduce_view
+        namespace["__module__"] = cls.__module__
+        namespace["__qualname__"] = cls.__qualname__
+        view = type(cls.__name__, (cls,), namespace)
+        _VIEWS[cls] = view
+    return view
+
+
+# Almacen columnar del estado de las unidades. Al agregar una unidad sus atributos numericos, su
+# posicion y su bando pasan a arreglos contiguos de NumPy y la instancia se convierte en una vista
+# de su fila, por lo que el codigo de las unidades (y de las clases generadas desde BattleScript)
+# sigue funcionando igual.
+class UnitStore:
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.units = []
+        self.columns = {name: zeros(capacity, dtype) for name, dtype in COLUMNS.items()}
+        for name in POSITION:
+            self.columns[name] = zeros(capacity, int64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    # columna con los valores de las unidades agregadas
+    def __getitem__(self, name: str):
+        return self.columns[name][:self.size]
+
+    def add(self, unit) -> int:
+        if getattr(unit, "_store", None) is not None:
+            raise Exception(f"Unit {unit.id} already belongs to a store")
+        if self.size == len(self.columns["life_points"]):
+            self.grow()
+
+        row = self.size
+        self.size += 1
+        self.units.append(unit)
+
+        values = {name: unit.__dict__.pop(name, 0) for name in COLUMNS}
+        cell = unit.__dict__.pop("cell", None)
+        side = unit.__dict__.pop("side", None)
+
+        unit.__class__ = view_class(type(unit))
+        unit._store = self
+        unit._row = row
+
+        for name, value in values.items():
+            self.columns[name][row] = value
+        unit.cell = cell
+        unit.side = side
+        return row
+
+    def grow(self):
+        for name, column in self.columns.items():
+            new = zeros(2 * len(column), column.dtype)
+            new[:len(column)] = column
+            self.columns[name] = new
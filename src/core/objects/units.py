@@ -1,12 +1,29 @@
-from typing import Tuple
+from typing import List, Tuple
 from .base_objects import BSObject
 from abc import abstractmethod
 from ..maps import *
+from ..simulator.events import UnitMoved, UnitAttacked, UnitHeld
+from ..simulator.resolver import Intent, ATTACK_ACTION, MOVE_ACTION, HOLD_ACTION
+from ...utils.rng import RandomStreams
+from numpy import array, arange, full, maximum, clip
 import math
-import random
+
+
+# metodos que se pueden redefinir en BattleScript y que move_costs calcula por su cuenta
+COST_METHODS = ("calculate_distance", "nearby_friend", "enemy_in_range", "in_range_of_enemy",
+                "move_cost_calculate")
+_DEFAULT_COSTS = {}
 
 
 class BSUnit(BSObject):
+    # flujos aleatorios de la unidad, el Simulator le asigna los suyos
+    streams = RandomStreams().unit(0)
+    # distancia al enemigo mas cercano al empezar el turno, el Simulator la calcula con un
+    # indice espacial; con 0 no se descarta ninguna busqueda
+    enemy_distance = 0
+    # sin enemigos cerca la unidad no busca enemigos ni los cuenta al moverse, lo decide el
+    # ActivityManager del Simulator
+    dormant = False
 
     @abstractmethod
     def __init__(self, id: int, life_points: float, defense: float, attack: float, moral: float, ofensive: float, min_range: int, max_range: int, radio: int, vision: int, intelligence: float, recharge_turns: int, solidarity: bool, movil: bool):
@@ -43,99 +60,73 @@ class BSUnit(BSObject):
 
     # chequear si hay amigos cerca de la celda
     def nearby_friend(self, cell) -> bool:
-        for i in range(cell.row - 1, cell.row + 2):
-            if i >= self.map.no_rows:
-                break
-            if i < 0:
-                continue
-            for j in range(cell.col - 1, cell.col + 2):
-                if j >= self.map.no_columns:
-                    break
-                if j < 0 or (i == cell.row and j == cell.col) or (i == self.cell.row and j == self.cell.col):
-                    continue
-                if self.map[i][j].bs_object is not None and isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side == self.side:
-                    return True
-        return False
+        side = self.grid_side()
+        friends = self.map.side_grid[max(cell.row - 1, 0):cell.row + 2,
+                                     max(cell.col - 1, 0):cell.col + 2] == side
+        count = friends.sum()
+        if count and self.map.side_grid[cell.row, cell.col] == side:
+            count -= 1
+        if count and self.cell != cell and abs(self.cell.row - cell.row) <= 1 \
+                and abs(self.cell.col - cell.col) <= 1 \
+                and self.map.side_grid[self.cell.row, self.cell.col] == side:
+            count -= 1
+        return count > 0
+
+    # valor del bando de la unidad en la rejilla del mapa
+    def grid_side(self) -> int:
+        return self.side.id if self.side is not None else NO_SIDE
+
+    # mascara de las celdas con unidades enemigas dados sus valores en la rejilla de bandos
+    def enemy_mask(self, values):
+        return (values != EMPTY) & (values != OBJECT) & (values != self.grid_side())
+
+    # posiciones con enemigos en los anillos de alcance alrededor de (row, col), en orden de
+    # recorrido
+    def enemies_in_rings(self, row: int, col: int) -> Tuple:
+        rows, cols = ring_cells(row, col, self.min_range, self.max_range, self.map.no_rows,
+                                self.map.no_columns)
+        enemies = self.enemy_mask(self.map.side_grid[rows, cols])
+        return rows[enemies], cols[enemies]
+
+    # cota inferior de la distancia de la celda al enemigo mas cercano, sabiendo cuanto pudo
+    # moverse cada enemigo desde que se calculo enemy_distance al empezar el turno
+    def enemy_lower_bound(self, cell) -> float:
+        return self.enemy_distance - MAX_STEP - self.calculate_distance(self.cell, cell)
 
     # chequea si hay enemigos en rango moviendose a esa celda
     def enemy_in_range(self, cell) -> Tuple[bool, Cell]:
-
-        for k in range(self.min_range, self.max_range + 1):
-
-            i = cell.row - k
-            if i >= 0:
-                for j in range(cell.col - k, cell.col + k + 1):
-                    if j >= self.map.no_columns:
-                        break
-                    if j < 0:
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        return (True, self.map[i][j])
-
-            i = cell.row + k
-            if i < self.map.no_rows:
-                for j in range(cell.col - k, cell.col + k + 1):
-                    if j >= self.map.no_columns:
-                        break
-                    if j < 0:
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        return (True, self.map[i][j])
-
-            j = cell.col - k
-            if j >= 0:
-                for i in range(cell.row - k + 1, cell.row + k):
-                    if i >= self.map.no_rows:
-                        break
-                    if i < 0:
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        return (True, self.map[i][j])
-
-            j = cell.col + k
-            if j < self.map.no_columns:
-                for i in range(cell.row - k + 1, cell.row + k):
-                    if i >= self.map.no_rows:
-                        break
-                    if i < 0:
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        return (True, self.map[i][j])
-
+        if self.enemy_lower_bound(cell) > self.max_range:
+            return (False, None)
+        rows, cols = self.enemies_in_rings(cell.row, cell.col)
+        if len(rows):
+            return (True, self.map[int(rows[0])][int(cols[0])])
         return (False, None)
 
     # detecta los enemigos de los que se puede estar en rango, aumentando del costo de moverse a esa celda
     def in_range_of_enemy(self, cell) -> int:
 
-        enemies=0
+        # con el mapa de amenaza del bando es una consulta directa, siempre que ningun enemigo
+        # alcance mas lejos que la vision de la unidad
+        threat = self.side.threat_map if self.side is not None else None
+        if threat is not None and self.vision >= threat.max_reach:
+            return threat.grid.item(cell.row, cell.col)
 
-        for i in range(cell.row - self.vision, cell.row + self.vision + 1):
-            if i >= self.map.no_rows:
-                break
-            if i < 0:
+        if self.enemy_lower_bound(cell) > self.vision:
+            return 0
+
+        r0 = max(cell.row - self.vision, 0)
+        c0 = max(cell.col - self.vision, 0)
+        window = self.map.side_grid[r0:cell.row + self.vision + 1, c0:cell.col + self.vision + 1]
+        rows, cols = self.enemy_mask(window).nonzero()
+
+        enemies = 0
+        for i, j in zip((rows + r0).tolist(), (cols + c0).tolist()):
+            if (i == cell.row and j == cell.col) or (i == self.cell.row and j == self.cell.col):
                 continue
-            for j in range(cell.col - self.vision, cell.col + self.vision + 1):
-                if j >= self.map.no_columns:
-                    break
-                if j < 0 or (i == cell.row and j == cell.col) or (i == self.cell.row and j == self.cell.col):
-                    continue
-                if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                    enemy = self.map[i][j].bs_object
-                    limits_max_range = (
-                        (enemy.cell.row - enemy.max_range,
-                         enemy.cell.col - enemy.max_range),
-                        (enemy.cell.row + enemy.max_range,
-                         enemy.cell.col + enemy.max_range)
-                    )
-                    limits_min_range = (
-                        (enemy.cell.row - enemy.min_range,
-                         enemy.cell.col - enemy.min_range),
-                        (enemy.cell.row + enemy.min_range,
-                         enemy.cell.col + enemy.min_range)
-                    )
-                    if cell.row >= limits_max_range[0][0] and cell.col >= limits_max_range[0][1] and cell.row <= limits_max_range[1][0] and cell.col <= limits_max_range[1][1]:
-                        if cell.row <= limits_min_range[0][0] or cell.row >= limits_min_range[1][0] or cell.col <= limits_min_range[0][1] or cell.col >= limits_min_range[1][1]:
-                            enemies += 1
+            enemy = self.map[i][j].bs_object
+            distance = max(abs(cell.row - i), abs(cell.col - j))
+            if enemy.min_range <= distance <= enemy.max_range:
+                enemies += 1
         return enemies
 
     # calcular el costo de moverse a la celda
@@ -170,32 +161,149 @@ class BSUnit(BSObject):
 
         return cost
 
+    # Los costos en bloque de move_costs repiten el calculo de estos metodos, asi que solo valen si
+    # la clase (por ejemplo una generada desde BattleScript) no redefine ninguno.
+    def has_default_costs(self) -> bool:
+        cls = type(self)
+        default = _DEFAULT_COSTS.get(cls)
+        if default is None:
+            default = _DEFAULT_COSTS[cls] = all(getattr(cls, name) is getattr(BSUnit, name)
+                                                for name in COST_METHODS)
+        return default
+
+    # Costo de moverse a cada vecino de la unidad, con los mismos valores que move_cost_calculate.
+    # Los ocho vecinos comparten una sola lectura de la ventana de bandos de 5x5 para contar los
+    # amigos, y la busqueda del enemigo en rango se hace para todos a la vez. Devuelve una matriz
+    # de 3x3 centrada en la unidad.
+    def move_costs(self, type) -> List[List[float]]:
+        land = self.map
+        row, col = self.cell.row, self.cell.col
+        side = self.grid_side()
+        sides = self.side_window(row - 2, row + 3, col - 2, col + 3).tolist()
+        itself = sides[2][2] == side
+        costs = [[float("inf")] * 3 for _ in range(3)]
+
+        candidates = []
+        for i in range(max(row - 1, 0), min(row + 2, land.no_rows)):
+            for j in range(max(col - 1, 0), min(col + 2, land.no_columns)):
+                cell = land[i][j]
+                if cell.passable == 0 or cell.type != type or cell.bs_object is not None:
+                    continue
+                if type == 'earth' and abs(cell.height - self.cell.height) > 0.3:
+                    continue
+
+                cost = 10-cell.passable/2
+                if cell in self.visited_cells:
+                    cost += cell.passable/3
+
+                a, b = i - row + 2, j - col + 2
+                box = sides[a - 1][b - 1:b + 2] + sides[a][b - 1:b + 2] + sides[a + 1][b - 1:b + 2]
+                if box.count(side) - itself > 0:
+                    if self.solidarity:
+                        cost /= 2
+                    else:
+                        cost /= math.sqrt(2)
+
+                costs[a - 1][b - 1] = cost
+                candidates.append((i, j))
+
+        if not candidates:
+            return costs
+
+        # sin enemigos cerca la atraccion y la amenaza valen 0
+        if self.dormant:
+            return costs
+
+        rows, cols = array(candidates).T
+        for (i, j), distance in zip(candidates, self.first_enemy_distances(rows, cols)):
+            if distance:
+                costs[i - row + 1][j - col + 1] -= self.ofensive*1 / math.sqrt(distance)
+
+        threat = self.side.threat_map if self.side is not None else None
+        if threat is not None and self.vision >= threat.max_reach:
+            enemies = threat.grid[rows, cols].tolist()
+        else:
+            enemies = self.threat_counts(rows, cols)
+        for (i, j), count in zip(candidates, enemies):
+            costs[i - row + 1][j - col + 1] += count*1.1
+
+        return costs
+
+    # Distancia desde la unidad al enemigo que encontraria enemy_in_range para cada celda, o 0 si
+    # no hay ninguno. Los anillos de todas las celdas se revisan en una sola operacion.
+    def first_enemy_distances(self, rows, cols) -> List[int]:
+        land = self.map
+        # con el indice espacial se sabe si algun enemigo puede estar en rango
+        if self.enemy_distance - MAX_STEP - 1 > self.max_range:
+            return [0] * len(rows)
+
+        offsets_rows, offsets_cols = ring_offsets(self.min_range, self.max_range)
+        ring_rows = rows[:, None] + offsets_rows
+        ring_cols = cols[:, None] + offsets_cols
+        inside = (ring_rows >= 0) & (ring_rows < land.no_rows) & \
+                 (ring_cols >= 0) & (ring_cols < land.no_columns)
+        values = land.side_grid[clip(ring_rows, 0, land.no_rows - 1),
+                                clip(ring_cols, 0, land.no_columns - 1)]
+        enemies = inside & self.enemy_mask(values)
+
+        first = enemies.argmax(axis=1)
+        k = arange(len(rows))
+        distances = maximum(abs(ring_rows[k, first] - self.cell.row),
+                            abs(ring_cols[k, first] - self.cell.col))
+        return (distances * enemies[k, first]).tolist()
+
+    # Lo mismo que in_range_of_enemy para varias celdas vecinas: los enemigos a la vista de
+    # alguna de ellas se buscan una sola vez y se cuentan con sus rangos para todas a la vez.
+    def threat_counts(self, rows, cols) -> List[int]:
+        land = self.map
+        vision = self.vision
+        r0 = max(self.cell.row - 1 - vision, 0)
+        c0 = max(self.cell.col - 1 - vision, 0)
+        window = land.side_grid[r0:self.cell.row + vision + 2, c0:self.cell.col + vision + 2]
+        enemy_rows, enemy_cols = self.enemy_mask(window).nonzero()
+        if not len(enemy_rows):
+            return [0] * len(rows)
+        enemy_rows += r0
+        enemy_cols += c0
+
+        ranges = array([(land[i][j].bs_object.min_range, land[i][j].bs_object.max_range)
+                        for i, j in zip(enemy_rows.tolist(), enemy_cols.tolist())])
+        distances = maximum(abs(rows[:, None] - enemy_rows), abs(cols[:, None] - enemy_cols))
+        counted = (distances <= vision) & (distances >= ranges[:, 0]) & (distances <= ranges[:, 1])
+        return counted.sum(axis=1).tolist()
+
+    # valores de la rejilla de bandos entre las filas row0..row1 y las columnas col0..col1, con
+    # EMPTY fuera del mapa
+    def side_window(self, row0: int, row1: int, col0: int, col1: int):
+        values = full((row1 - row0, col1 - col0), EMPTY)
+        inner = self.map.side_grid[max(row0, 0):row1, max(col0, 0):col1]
+        top = max(-row0, 0)
+        left = max(-col0, 0)
+        values[top:top + inner.shape[0], left:left + inner.shape[1]] = inner
+        return values
+
     def enemy_cost_calculate(self, enemy) -> float:
         damage = self.attack + (self.moral + self.cell.passable)/2
 
-        estimated_life_points = random.uniform(max(0, enemy.life_points - 10 + self.intelligence),
-                                               min(10, enemy.life_points + 10 - self.intelligence))
+        estimate = self.streams.estimate
+        estimated_life_points = estimate.uniform(max(0, enemy.life_points - 10 + self.intelligence),
+                                                 min(10, enemy.life_points + 10 -
+                                                     self.intelligence))
 
-        estimated_defense = random.uniform(max(0, enemy.defense - 10 + self.intelligence),
-                                           min(10, enemy.defense + 10 - self.intelligence))
+        estimated_defense = estimate.uniform(max(0, enemy.defense - 10 + self.intelligence),
+                                             min(10, enemy.defense + 10 - self.intelligence))
 
         return estimated_life_points / (damage / estimated_defense)
 
     # detecta si un amigo pudiera ser afectado por el ataque
     def friend_in_danger(self, cell) -> bool:
-        for i in range(self.cell.row - 1, self.cell.row + 2):
-            if i >= self.map.no_rows:
-                break
-            if i < 0:
-                continue
-            for j in range(cell.col - 1, cell.col + 2):
-                if j >= self.map.no_columns:
-                    break
-                if j < 0 or (i == self.cell.row and j == self.cell.col):
-                    continue
-                if self.map[i][j].bs_object is not None and isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side == self.side:
-                    return True
-        return False
+        side = self.grid_side()
+        count = (self.map.side_grid[max(self.cell.row - 1, 0):self.cell.row + 2,
+                                    max(cell.col - 1, 0):cell.col + 2] == side).sum()
+        if count and abs(self.cell.col - cell.col) <= 1 \
+                and self.map.side_grid[self.cell.row, self.cell.col] == side:
+            count -= 1
+        return count > 0
 
     # buscar enemigo para atacar
     def enemy_to_attack(self):
@@ -203,79 +311,32 @@ class BSUnit(BSObject):
         cost = float('inf')
         attacked_enemy = None
 
-        for k in range(self.min_range, self.max_range + 1):
-            i = self.cell.row - k
-            if i >= 0:
-                for j in range(self.cell.col - k, self.cell.col + k + 1):
-                    if j >= self.map.no_columns:
-                        break
-                    if j < 0 or (i == self.cell.row and j == self.cell.col):
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        if self.radio > 1 and self.friend_in_danger(self.map[i][j]):
-                            continue
-                        new_cost = self.enemy_cost_calculate(
-                            self.map[i][j].bs_object)
-                        if cost > new_cost:
-                            cost = new_cost
-                            attacked_enemy = self.map[i][j].bs_object
-
-            i = self.cell.row+k
-            if i < self.map.no_rows:
-                for j in range(self.cell.col-k, self.cell.col+k+1):
-                    if j >= self.map.no_columns:
-                        break
-                    if j < 0 or (i == self.cell.row and j == self.cell.col):
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        if self.radio > 1 and self.friend_in_danger(self.map[i][j]):
-                            continue
-                        new_cost = self.enemy_cost_calculate(
-                            self.map[i][j].bs_object)
-                        if cost > new_cost:
-                            cost = new_cost
-                            attacked_enemy = self.map[i][j].bs_object
-
-            j = self.cell.col-k
-            if j >= 0:
-                for i in range(self.cell.row-k+1, self.cell.row+k):
-                    if i >= self.map.no_rows:
-                        break
-                    if i < 0:
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        if self.radio > 1 and self.friend_in_danger(self.map[i][j]):
-                            continue
-                        new_cost = self.enemy_cost_calculate(
-                            self.map[i][j].bs_object)
-                        if cost > new_cost:
-                            cost = new_cost
-                            attacked_enemy = self.map[i][j].bs_object
-
-            j = self.cell.col+k
-            if j < self.map.no_columns:
-                for i in range(self.cell.row-k+1, self.cell.row+k):
-                    if i >= self.map.no_rows:
-                        break
-                    if i < 0:
-                        continue
-                    if isinstance(self.map[i][j].bs_object, BSUnit) and self.map[i][j].bs_object.side != self.side:
-                        if self.radio > 1 and self.friend_in_danger(self.map[i][j]):
-                            continue
-                        new_cost = self.enemy_cost_calculate(
-                            self.map[i][j].bs_object)
-                        if cost > new_cost:
-                            cost = new_cost
-                            attacked_enemy = self.map[i][j].bs_object
+        if self.enemy_lower_bound(self.cell) > self.max_range:
+            return None
+
+        rows, cols = self.enemies_in_rings(self.cell.row, self.cell.col)
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            if i == self.cell.row and j == self.cell.col:
+                continue
+            if self.radio > 1 and self.friend_in_danger(self.map[i][j]):
+                continue
+            new_cost = self.enemy_cost_calculate(self.map[i][j].bs_object)
+            if cost > new_cost:
+                cost = new_cost
+                attacked_enemy = self.map[i][j].bs_object
 
         return attacked_enemy
 
     # tomar danio
     def take_damage(self, damage):
+        life_points = self.life_points
         self.life_points -= damage/(self.defense+self.moral)
         if self.life_points <= 0:
             self.life_points=0
-            self.cell.bs_object = None
+            self.map.vacate(self.cell.row, self.cell.col)
+            if self.side is not None:
+                self.side.unit_defeated(self)
+        self.record_hit(life_points)
 
     # atacar enemigo
     def attack_enemy(self, enemy):
@@ -298,7 +359,7 @@ class BSUnit(BSObject):
                 if self.map[i][j].bs_object != None and self.calculate_distance(self.cell, self.map[i][j]) <= enemy_distance:
                     block_objects.append(self.map[i][j].bs_object)
 
-        precision = random.uniform(0, 1)
+        precision = self.streams.attack.uniform(0, 1)
 
         miss_distance = (enemy_distance-self.min_range) / \
             (self.max_range-self.min_range+0.1)/10
@@ -316,7 +377,7 @@ class BSUnit(BSObject):
                 while cells_to_attack:
                     cells_to_attack -= 1
 
-                    randint = random.randint(0, len(positions) - 1)
+                    randint = self.streams.attack.randint(0, len(positions) - 1)
                     position = positions[randint]
                     positions.pop(randint)
 
@@ -340,7 +401,7 @@ class BSUnit(BSObject):
                 while cells_to_attack:
                     cells_to_attack -= 1
 
-                    randint = random.randint(0, len(positions)-1)
+                    randint = self.streams.attack.randint(0, len(positions)-1)
                     position = positions[randint]
                     positions.pop(randint)
                     if self.cell.row + position[0] < 0 or self.cell.row + position[0] >= self.map.no_rows or self.cell.col+position[1] < 0 or self.cell.col+position[1] >= self.map.no_columns:
@@ -361,27 +422,41 @@ class BSUnit(BSObject):
             self.side.no_enemy_units_defeated += 1
             enemy.side.no_own_units_defeated += 1
 
+    # Atacar al enemigo y devolver los golpes que anoto take_damage. Si un take_damage redefinido
+    # no llama al original, el golpe al enemigo se anota igual.
+    def strike(self, enemy) -> Tuple:
+        life_points = enemy.life_points
+        BSObject.hits = hits = []
+        try:
+            self.attack_enemy(enemy)
+        finally:
+            BSObject.hits = None
+        if enemy.life_points != life_points and all(id != enemy.id for id, _, _ in hits):
+            hits.append((enemy.id, life_points - enemy.life_points, enemy.life_points))
+        return tuple(hits)
+
     # moverse a una celda
     def move_to_cell(self, cell):
-        self.cell.bs_object = None
+        self.map.move(self, cell)
         self.cell = cell
-        cell.bs_object = self
 
     # turno de la unidad
     def turn(self, type):
+        return self.apply(self.decide_turn(type))
+
+    # Decidir la accion del turno sin modificar el mapa. Solo avanza el flujo de estimacion de la
+    # unidad, cuyo estado queda en la intencion.
+    def decide_turn(self, type) -> Intent:
 
         enemy = None
-        if self.turns_recharging == 0:
+        if self.turns_recharging == 0 and not self.dormant:
             enemy = self.enemy_to_attack()
-        else:
-            self.turns_recharging -= 1
 
         if enemy is not None:
-            self.attack_enemy(enemy)
-            self.turns_recharging = self.recharge_turns
-            print(
-                f"Unit {self.id} attacks Unit {enemy.id} in cell {enemy.cell}")
+            return Intent(self.id, ATTACK_ACTION, enemy.cell.row, enemy.cell.col, enemy.id,
+                          self.streams.estimate.getstate())
         elif self.movil:
+            costs = self.move_costs(type) if self.has_default_costs() else None
             cost = float("inf")
             cell = self.cell
             for i in range(self.cell.row-1, self.cell.row+2):
@@ -394,21 +469,48 @@ class BSUnit(BSObject):
                         break
                     if j < 0 or (i == self.cell.row and j == self.cell.col):
                         continue
-                    new_cost = self.move_cost_calculate(self.map[i][j], type)
+                    # el recorrido puede desplazar las columnas fuera de los vecinos
+                    if costs is not None and abs(j - self.cell.col) <= 1:
+                        new_cost = costs[i - self.cell.row + 1][j - self.cell.col + 1]
+                    else:
+                        new_cost = self.move_cost_calculate(self.map[i][j], type)
                     if new_cost < cost:
                         cost = new_cost
                         cell = self.map[i][j]
             if cost < float("inf"):
+                return Intent(self.id, MOVE_ACTION, cell.row, cell.col, -1,
+                              self.streams.estimate.getstate())
+        return Intent(self.id, HOLD_ACTION, -1, -1, -1, self.streams.estimate.getstate())
+
+    # Aplicar una intencion. Si el objetivo ya no esta en su celda o la celda de destino se ocupo
+    # desde que se decidio (solo pasa en turnos simultaneos), la unidad espera.
+    def apply(self, intent: Intent):
+        self.streams.estimate.setstate(intent.estimate)
+
+        if intent.action == ATTACK_ACTION:
+            enemy = self.map[intent.row][intent.col].bs_object
+            if enemy is not None and enemy.id == intent.target:
+                hits = self.strike(enemy)
+                self.turns_recharging = self.recharge_turns
+                return UnitAttacked(self.id, enemy.id, enemy.cell.row, enemy.cell.col, hits=hits)
+            return UnitHeld(self.id)
+
+        if self.turns_recharging != 0:
+            self.turns_recharging -= 1
+
+        if intent.action == MOVE_ACTION:
+            cell = self.map[intent.row][intent.col]
+            if cell.bs_object is None:
                 self.move_to_cell(cell)
                 self.visited_cells.add(cell)
-                print(f"Unit {self.id} moving to cell {cell}")
-            else:
-                print(f"Unit {self.id} hold position")
-        else:
-            print(f"Unit {self.id} hold position")
-            
+                return UnitMoved(self.id, cell.row, cell.col)
+        return UnitHeld(self.id)
+
 
 class LandUnit(BSUnit):
+    # tipo de celda por el que se mueve
+    cell_type = "earth"
+
     def __init__(self, id, life_points, defense, attack, moral, ofensive,min_range, max_range, radio, vision, intelligence, recharge_turns, solidarity, movil):
         BSUnit.__init__(self,id,life_points,defense,attack,moral,ofensive,min_range,max_range,radio,vision,intelligence,recharge_turns,solidarity,movil)
 
@@ -416,10 +518,15 @@ class LandUnit(BSUnit):
         BSUnit.put_in_cell(self,map, "earth", row, col)
 
     def turn(self):
-        BSUnit.turn(self,'earth')
+        return BSUnit.turn(self,'earth')
+
+    def decide(self):
+        return BSUnit.decide_turn(self,'earth')
 
 
 class NavalUnit(BSUnit):
+    cell_type = "water"
+
     def __init__(self, id, life_points, defense, attack, moral, ofensive,min_range, max_range, radio, vision, intelligence, recharge_turns, solidarity, movil):
         BSUnit.__init__(self,id,life_points,defense,attack,moral,ofensive,min_range,max_range,radio,vision,intelligence,recharge_turns,solidarity,movil)
 
@@ -427,4 +534,7 @@ class NavalUnit(BSUnit):
         BSUnit.put_in_cell(self,map, "water", row, col)
 
     def turn(self):
-        BSUnit.turn(self,'water')
+        return BSUnit.turn(self,'water')
+
+    def decide(self):
+        return BSUnit.decide_turn(self,'water')
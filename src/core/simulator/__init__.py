@@ -1,2 +1,14 @@
 from .sides import *
-from .simulator import *
\ No newline at end of file
+from .scheduler import *
+from .sampling import *
+from .events import *
+from .resolver import *
+from .activity import *
+from .warp import *
+from .sinks import *
+from .replay import *
+from .stream import *
+from .replica import *
+from .simulator import *
+from .shards import *
+from .batch import *
\ No newline at end of file
@@ -0,0 +1,38 @@
+from importlib import import_module
+from tabulate import tabulate
+from typer import run, Argument, Option
+from .batch import run_batch, run_adaptive, win
+
+
+# cargar la fabrica de escenarios a partir de "paquete.modulo:funcion"
+def load_factory(path: str):
+    module, _, name = path.partition(":")
+    if not name:
+        raise ValueError(f"Factory {path} must have the form module:function")
+    return getattr(import_module(module), name)
+
+
+def batch(factory: str = Argument(..., help="Scenario factory as module:function"),
+          replicas: int = Option(100, help="Number of replicas"),
+          workers: int = Option(0, help="Worker processes (0 uses every core)"),
+          seed: int = Option(None, help="Root seed"),
+          width: float = Option(None, help="Stop when the win rate interval of --side is narrower "
+                                           "than this"),
+          side: int = Option(1, help="Side whose win rate drives --width"),
+          wave: int = Option(64, help="Replicas per wave when --width is given")):
+    if width is None:
+        result = run_batch(load_factory(factory), replicas, workers or None, seed)
+    else:
+        result = run_adaptive(load_factory(factory), win(side), width, wave=wave,
+                              max_replicas=replicas, workers=workers or None, seed=seed)
+
+    print(f"Replicas: {len(result)}\tDraws: {result.draw_rate()}")
+    if result.interval is not None:
+        interval = result.interval
+        print(f"Side {side} win rate: {interval.mean} [{interval.low}, {interval.high}]")
+    print(tabulate(result.summary(),
+                   headers=["Sides", "Win Rate", "Allies Dead", "Enemies Killed"]))
+
+
+if __name__ == "__main__":
+    run(batch)
@@ -0,0 +1,35 @@
+from typing import List
+from ..maps.geometry import MAX_STEP
+
+
+# Marca como dormidas las unidades que no tienen ningun enemigo dentro de su radio de despertar.
+# Una unidad dormida no busca enemigos para atacar y se mueve sin calcular la atraccion ni la
+# amenaza de los enemigos, que con ellos tan lejos valen 0, por lo que decide lo mismo que si
+# estuviera despierta. Se actualiza en cada turno con las distancias del indice espacial, asi que
+# una unidad despierta en cuanto un enemigo se acerca.
+class ActivityManager:
+
+    def __init__(self):
+        # unidades dormidas y despiertas en el ultimo turno
+        self.no_dormant = 0
+        self.no_awake = 0
+
+    # Distancia desde la que ningun enemigo puede influir en la unidad durante el turno: su vision,
+    # su rango o el mayor alcance enemigo, mas lo que se pueden mover la unidad y los enemigos.
+    def wake_radius(self, unit, enemy_reach: int) -> int:
+        return max(unit.vision, unit.max_range, enemy_reach) + 2 * MAX_STEP
+
+    def update(self, sides: List):
+        reach = {side.id: max((unit.max_range for unit in side.alive_units), default=0)
+                 for side in sides}
+        self.no_dormant = 0
+        self.no_awake = 0
+
+        for side in sides:
+            enemy_reach = max((value for id, value in reach.items() if id != side.id), default=0)
+            for unit in side.alive_units:
+                unit.dormant = unit.enemy_distance > self.wake_radius(unit, enemy_reach)
+                if unit.dormant:
+                    self.no_dormant += 1
+                else:
+                    self.no_awake += 1
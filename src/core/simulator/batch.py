@@ -0,0 +1,230 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os import cpu_count
+from statistics import NormalDist, fmean, stdev
+from typing import Callable, Dict, List, NamedTuple, Optional
+from numpy.random import SeedSequence
+from .sinks import NullSink
+from ...utils.rng import RandomStreams
+
+
+# Resultado de una replica: semilla usada, turnos jugados, bando ganador (None si no hubo) y
+# las bajas propias y enemigas de cada bando.
+class ReplicaResult(NamedTuple):
+    seed: int
+    turns: int
+    winner: Optional[int]
+    own_defeated: Dict[int, int]
+    enemy_defeated: Dict[int, int]
+
+
+# Intervalo de confianza de la media de una metrica.
+class Interval(NamedTuple):
+    mean: float
+    low: float
+    high: float
+
+    @property
+    def width(self) -> float:
+        return self.high - self.low
+
+
+class BatchResult:
+
+    def __init__(self, replicas: List[ReplicaResult], interval: Interval = None):
+        self.replicas = replicas
+        self.interval = interval
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def __iter__(self):
+        return iter(self.replicas)
+
+    @property
+    def side_ids(self) -> List[int]:
+        ids = set()
+        for replica in self.replicas:
+            ids.update(replica.own_defeated)
+        return sorted(ids)
+
+    def win_rate(self, side_id: int) -> float:
+        return sum(1 for r in self.replicas if r.winner == side_id) / len(self.replicas)
+
+    def draw_rate(self) -> float:
+        return sum(1 for r in self.replicas if r.winner is None) / len(self.replicas)
+
+    def mean_own_defeated(self, side_id: int) -> float:
+        return sum(r.own_defeated[side_id] for r in self.replicas) / len(self.replicas)
+
+    def mean_enemy_defeated(self, side_id: int) -> float:
+        return sum(r.enemy_defeated[side_id] for r in self.replicas) / len(self.replicas)
+
+    def summary(self) -> List[List]:
+        return [[f"Side {id}", self.win_rate(id), self.mean_own_defeated(id),
+                 self.mean_enemy_defeated(id)] for id in self.side_ids]
+
+
+# metrica: 1 si gano el bando, 0 en otro caso
+def win(side_id: int) -> Callable[[ReplicaResult], float]:
+    return partial(_win, side_id)
+
+
+# metrica: unidades perdidas por el bando
+def casualties(side_id: int) -> Callable[[ReplicaResult], float]:
+    return partial(_casualties, side_id)
+
+
+def _win(side_id: int, replica: ReplicaResult) -> float:
+    return 1.0 if replica.winner == side_id else 0.0
+
+
+def _casualties(side_id: int, replica: ReplicaResult) -> float:
+    return float(replica.own_defeated[side_id])
+
+
+# Intervalo de confianza de la media. Para metricas 0/1 se usa el intervalo de Wilson, que no
+# colapsa a ancho 0 cuando todas las replicas dan el mismo resultado; si no, la aproximacion normal.
+def confidence_interval(values: List[float], confidence: float = 0.95) -> Interval:
+    if all(value in (0.0, 1.0) for value in values):
+        return wilson_interval(values, confidence)
+    return normal_interval(values, confidence)
+
+
+def normal_interval(values: List[float], confidence: float = 0.95) -> Interval:
+    n = len(values)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    mean = fmean(values)
+    half = z * stdev(values) / n ** 0.5 if n > 1 else float("inf")
+    return Interval(mean, mean - half, mean + half)
+
+
+def wilson_interval(values: List[float], confidence: float = 0.95) -> Interval:
+    n = len(values)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    mean = fmean(values)
+    center = (mean + z * z / (2 * n)) / (1 + z * z / n)
+    half = z / (1 + z * z / n) * (mean * (1 - mean) / n + z * z / (4 * n * n)) ** 0.5
+    return Interval(mean, center - half, center + half)
+
+
+# semillas independientes para cada replica a partir de una semilla raiz
+def spawn_seeds(seed, replicas: int) -> List[int]:
+    return [int(child.generate_state(1)[0]) for child in SeedSequence(seed).spawn(replicas)]
+
+
+# Ejecutar una replica sin salida por consola y resumir el resultado. seed puede ser un entero o
+# un RandomStreams, que se pasa tal cual a la fabrica.
+def run_replica(factory: Callable, seed) -> ReplicaResult:
+    number = seed.seed if isinstance(seed, RandomStreams) else seed
+    simulator = factory(seed)
+    simulator.sink = NullSink()
+    simulator.start()
+
+    alive = [side.id for side in simulator.sides if side.no_alive_units > 0]
+
+    return ReplicaResult(
+        number,
+        simulator.turn,
+        alive[0] if len(alive) == 1 else None,
+        {side.id: side.no_own_units_defeated for side in simulator.sides},
+        {side.id: side.no_enemy_units_defeated for side in simulator.sides}
+    )
+
+
+# Ejecutar replicas del escenario en un pool de procesos. factory recibe la semilla de la replica,
+# que tiene que pasar al Simulator (y a build_random_map si genera el mapa), y devuelve el
+# Simulator listo para empezar; tiene que poder serializarse (funcion de modulo).
+def run_batch(factory: Callable, replicas: int, workers: int = None, seed=None) -> BatchResult:
+    seeds = spawn_seeds(seed, replicas)
+    return BatchResult(_run_seeds(factory, seeds, workers))
+
+
+def _run_seeds(factory: Callable, seeds: List[int], workers: int = None,
+               pool=None) -> List[ReplicaResult]:
+    return _map(partial(run_replica, factory), seeds, workers, pool)
+
+
+def _map(task: Callable, seeds: List[int], workers: int = None, pool=None) -> List:
+    workers = workers or cpu_count() or 1
+
+    if workers == 1 or len(seeds) == 1:
+        return list(map(task, seeds))
+
+    chunksize = max(1, len(seeds) // (workers * 4))
+    if pool is not None:
+        return list(pool.map(task, seeds, chunksize=chunksize))
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(task, seeds, chunksize=chunksize))
+
+
+# Ejecutar replicas por oleadas de tamanio wave hasta que el intervalo de confianza de la metrica
+# sea mas estrecho que width o se llegue a max_replicas. Las semillas son las mismas que usaria
+# run_batch con la misma semilla raiz, asi que el resultado es un prefijo de la ejecucion completa.
+def run_adaptive(factory: Callable, metric: Callable[[ReplicaResult], float], width: float,
+                 confidence: float = 0.95, wave: int = 64, max_replicas: int = 100000,
+                 workers: int = None, seed=None) -> BatchResult:
+    root = SeedSequence(seed)
+    replicas = []
+    interval = None
+    workers = workers or cpu_count() or 1
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    try:
+        while len(replicas) < max_replicas:
+            size = min(wave, max_replicas - len(replicas))
+            seeds = [int(child.generate_state(1)[0]) for child in root.spawn(size)]
+            replicas.extend(_run_seeds(factory, seeds, workers, pool))
+
+            interval = confidence_interval([metric(replica) for replica in replicas], confidence)
+            if interval.width < width:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return BatchResult(replicas, interval)
+
+
+# Comparacion de dos variantes con numeros aleatorios comunes. differences tiene, por cada semilla,
+# la metrica de b menos la de a; con antithetic cada valor es el promedio de la pareja de replicas
+# con U y 1 - U.
+class PairedResult:
+
+    def __init__(self, a: BatchResult, b: BatchResult, differences: List[float],
+                 interval: Interval):
+        self.a = a
+        self.b = b
+        self.differences = differences
+        self.interval = interval
+
+    # la diferencia es significativa si el intervalo no contiene el 0
+    @property
+    def significant(self) -> bool:
+        return self.interval.low > 0 or self.interval.high < 0
+
+
+def _run_pair(factory_a: Callable, factory_b: Callable, antithetic: bool, seed: int):
+    streams = [RandomStreams(seed)]
+    if antithetic:
+        streams.append(RandomStreams(seed, antithetic=True))
+    return ([run_replica(factory_a, s) for s in streams],
+            [run_replica(factory_b, s) for s in streams])
+
+
+# Ejecutar las dos variantes con las mismas semillas. Las fabricas reciben un RandomStreams en
+# lugar de un entero y deben pasarlo como seed al Simulator.
+def run_paired(factory_a: Callable, factory_b: Callable, metric: Callable[[ReplicaResult], float],
+               replicas: int, antithetic: bool = False, confidence: float = 0.95,
+               workers: int = None, seed=None) -> PairedResult:
+    pairs = _map(partial(_run_pair, factory_a, factory_b, antithetic), spawn_seeds(seed, replicas),
+                 workers)
+
+    differences = [fmean(metric(r) for r in b) - fmean(metric(r) for r in a) for a, b in pairs]
+
+    return PairedResult(
+        BatchResult([r for a, _ in pairs for r in a]),
+        BatchResult([r for _, b in pairs for r in b]),
+        differences,
+        normal_interval(differences, confidence)
+    )
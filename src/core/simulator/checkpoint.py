@@ -0,0 +1,139 @@
+import gc
+from numpy import array, fromiter, save, load, cumsum, int64, uint64, float64
+from ...utils.rng import RandomStreams
+
+MAGIC = b"BSCK"
+VERSION = 1
+NO_ARRAYS = 17
+
+
+def _is_path(file) -> bool:
+    return isinstance(file, (str, bytes)) or hasattr(file, "__fspath__")
+
+
+# Escribir una secuencia de arreglos de NumPy (una columna por atributo) en un archivo binario.
+# Solo se guarda el estado mutable de la simulacion; el escenario (mapa, unidades, bandos) lo
+# reconstruye quien carga. El recolector de basura se pausa porque recorreria todo el grafo de
+# celdas y unidades en cada ronda de listas temporales.
+def save_checkpoint(simulator, file):
+    if _is_path(file):
+        with open(file, "wb") as f:
+            return save_checkpoint(simulator, f)
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _save(simulator, file)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _save(simulator, file):
+    units = simulator.units
+    n = len(units)
+    index = {id(unit): i for i, unit in enumerate(units)}
+    cells = [unit.cell for unit in units]
+    visited = [cell for unit in units for cell in unit.visited_cells]
+    heap = simulator.scheduler.heap
+    seed = simulator.streams.seed
+
+    file.write(MAGIC)
+    for data in (
+        array([VERSION, simulator.turn, int(simulator.no_enemies), seed & (2**63 - 1), seed >> 63,
+               int(simulator.streams.antithetic)], dtype=int64),
+        array([simulator.time], dtype=float64),
+        array([side.no_own_units_defeated for side in simulator.sides], dtype=int64),
+        array([side.no_enemy_units_defeated for side in simulator.sides], dtype=int64),
+        fromiter((unit.id for unit in units), int64, n),
+        fromiter((unit.life_points for unit in units), float64, n),
+        fromiter((unit.turns_recharging for unit in units), int64, n),
+        fromiter((unit.no_defeated_units for unit in units), int64, n),
+        fromiter((cell.row if cell is not None else -1 for cell in cells), int64, n),
+        fromiter((cell.col if cell is not None else -1 for cell in cells), int64, n),
+        fromiter((unit.streams.estimate.getstate() for unit in units), uint64, n),
+        fromiter((unit.streams.attack.getstate() for unit in units), uint64, n),
+        fromiter((len(unit.visited_cells) for unit in units), int64, n),
+        fromiter((cell.row for cell in visited), int64, len(visited)),
+        fromiter((cell.col for cell in visited), int64, len(visited)),
+        fromiter((index[id(unit)] for unit in simulator.pending), int64, len(simulator.pending)),
+        array([(turn, time, index[id(unit)]) for turn, time, _, unit in heap],
+              dtype=float64).reshape(-1, 3),
+    ):
+        save(file, data, allow_pickle=False)
+
+
+# Restaurar sobre un Simulator construido con el mismo escenario que el que se guardo.
+def load_checkpoint(simulator, file):
+    if _is_path(file):
+        with open(file, "rb") as f:
+            return load_checkpoint(simulator, f)
+
+    if file.read(len(MAGIC)) != MAGIC:
+        raise Exception("Not a simulation checkpoint")
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _load(simulator, [load(file, allow_pickle=False) for _ in range(NO_ARRAYS)])
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _load(simulator, arrays):
+    header, time, own, enemy, ids, life_points, recharging, defeated, rows, cols, \
+        estimate, attack, no_visited, visited_rows, visited_cols, pending, heap = arrays
+
+    if header[0] != VERSION:
+        raise Exception(f"Unsupported checkpoint version {header[0]}")
+    units = simulator.units
+    if len(units) != len(ids) or any(unit.id != id for unit, id in zip(units, ids.tolist())):
+        raise Exception("Checkpoint does not match the simulation")
+
+    simulator.turn = int(header[1])
+    simulator.no_enemies = bool(header[2])
+    simulator.time = float(time[0])
+    simulator.streams = RandomStreams(int(header[3]) | int(header[4]) << 63, bool(header[5]))
+    simulator.sampler.streams = simulator.streams
+
+    for side, own_defeated, enemy_defeated in zip(simulator.sides, own.tolist(), enemy.tolist()):
+        side.no_own_units_defeated = own_defeated
+        side.no_enemy_units_defeated = enemy_defeated
+
+    # vaciar las celdas ocupadas antes de volver a colocar las unidades
+    for unit in units:
+        if unit.cell is not None and unit.cell.bs_object is unit:
+            unit.cell.bs_object = None
+
+    matrix = simulator.earth_map.matrix
+    visited = [matrix[r][c] for r, c in zip(visited_rows.tolist(), visited_cols.tolist())]
+    ends = cumsum(no_visited)
+    begs = (ends - no_visited).tolist()
+    ends = ends.tolist()
+
+    for unit, life, turns, no_defeated, row, col, state_estimate, state_attack, beg, end in zip(
+            units, life_points.tolist(), recharging.tolist(), defeated.tolist(), rows.tolist(),
+            cols.tolist(), estimate.tolist(), attack.tolist(), begs, ends):
+        unit.life_points = life
+        unit.turns_recharging = turns
+        unit.no_defeated_units = no_defeated
+        unit.streams.estimate.setstate(state_estimate)
+        unit.streams.attack.setstate(state_attack)
+        if row >= 0:
+            cell = matrix[row][col]
+            unit.cell = cell
+            if life > 0:
+                cell.bs_object = unit
+        else:
+            unit.cell = None
+        unit.visited_cells = set(visited[beg:end])
+
+    simulator.earth_map.refresh_occupancy()
+    for side in simulator.sides:
+        side.reset_alive()
+
+    simulator.pending = [units[i] for i in pending.tolist()]
+    simulator.scheduler.clear()
+    for turn, time, i in heap.tolist():
+        simulator.scheduler.schedule(units[int(i)], int(turn), time)
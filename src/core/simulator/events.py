@@ -0,0 +1,69 @@
+from typing import List, NamedTuple, Optional, Tuple
+from ..maps.maps import NO_SIDE
+
+
+# Eventos tipados que emiten el simulador y las unidades. Solo guardan datos, el formato lo
+# decide cada sumidero.
+
+# Estado de una unidad en un momento dado. Los eventos guardan copias y no las unidades, que
+# siguen cambiando despues de emitirlos. Sin celda la fila y la columna valen -1.
+class UnitSnapshot(NamedTuple):
+    id: int
+    side: int
+    life_points: float
+    row: int
+    col: int
+
+
+# copiar el estado actual de las unidades
+def snapshot(units: List) -> Tuple[UnitSnapshot, ...]:
+    return tuple(UnitSnapshot(unit.id, unit.side.id if unit.side is not None else NO_SIDE,
+                              unit.life_points,
+                              unit.cell.row if unit.cell is not None else -1,
+                              unit.cell.col if unit.cell is not None else -1) for unit in units)
+
+
+class SimulationStarted(NamedTuple):
+    turn: int
+    units: Tuple[UnitSnapshot, ...]
+
+
+# units esta vacio si el sumidero no pide el estado de las unidades (EventSink.wants_snapshots)
+class TurnStarted(NamedTuple):
+    turn: int
+    units: Tuple[UnitSnapshot, ...]
+
+
+class TurnEnded(NamedTuple):
+    turn: int
+
+
+class UnitMoved(NamedTuple):
+    unit: int
+    row: int
+    col: int
+    time: Optional[float] = None
+
+
+class UnitAttacked(NamedTuple):
+    unit: int
+    target: int
+    row: int
+    col: int
+    time: Optional[float] = None
+    # (id, puntos de vida perdidos, puntos de vida restantes) de cada objeto alcanzado
+    hits: Tuple = ()
+
+
+class UnitHeld(NamedTuple):
+    unit: int
+    time: Optional[float] = None
+
+
+class TurnsWarped(NamedTuple):
+    first: int
+    last: int
+
+
+class SimulationFinished(NamedTuple):
+    sides: List
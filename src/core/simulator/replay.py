@@ -0,0 +1,260 @@
+import struct
+import zlib
+from numpy import array, dtype, empty, frombuffer, memmap, concatenate, nan, full, unique, \
+    searchsorted, isin, int64, float64
+from .events import *
+from .sinks import EventSink
+
+MAGIC = b"BSRP"
+VERSION = 1
+COMPRESSED = 1
+
+# Registro de ancho fijo de la traza. Los campos que no aplican a una accion valen -1 (o nan)
+#   SPAWN:  posicion inicial de la unidad, target es su bando (NO_SIDE si no tiene) y value sus
+#           puntos de vida
+#   MOVE:   celda destino
+#   ATTACK: celda y id del objetivo, value es el danio total causado
+#   HIT:    unit es el objeto alcanzado, target el atacante y value los puntos de vida que le quedan
+#   HOLD:   la unidad espera
+#   WARP:   turnos adelantados, de target a turn
+RECORD = dtype([("turn", "<i4"), ("action", "u1"), ("unit", "<i8"), ("row", "<i4"), ("col", "<i4"),
+                ("target", "<i8"), ("value", "<f8"), ("time", "<f8")])
+SPAWN, MOVE, ATTACK, HIT, HOLD, WARP = range(6)
+
+_HEADER = struct.Struct("<4sHHI")
+_CHUNK = struct.Struct("<II")
+
+
+def _is_path(file) -> bool:
+    return isinstance(file, (str, bytes)) or hasattr(file, "__fspath__")
+
+
+def _time(time) -> float:
+    return nan if time is None else time
+
+
+# Sumidero que escribe las acciones de la simulacion como registros binarios de ancho fijo. Los
+# registros se acumulan hasta chunk_size y se escriben en bloque, opcionalmente comprimidos con
+# zlib, por lo que la memoria no crece con la duracion de la batalla.
+class ReplayWriter(EventSink):
+    wants_snapshots = False
+
+    def __init__(self, file, chunk_size: int = 65536, compress: bool = False):
+        self.owned = _is_path(file)
+        self.file = open(file, "wb") if self.owned else file
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.records = []
+        self.turn = 0
+        flags = COMPRESSED if compress else 0
+        self.file.write(_HEADER.pack(MAGIC, VERSION, flags, RECORD.itemsize))
+
+    def emit(self, event):
+        records = self.records
+        turn = self.turn
+        if isinstance(event, UnitMoved):
+            time = _time(event.time)
+            records.append((turn, MOVE, event.unit, event.row, event.col, -1, nan, time))
+        elif isinstance(event, UnitAttacked):
+            time = _time(event.time)
+            damage = 0.0
+            for id, lost, life_points in event.hits:
+                records.append((turn, HIT, id, -1, -1, event.unit, life_points, time))
+                damage += lost
+            records.append((turn, ATTACK, event.unit, event.row, event.col, event.target, damage,
+                            time))
+        elif isinstance(event, UnitHeld):
+            records.append((self.turn, HOLD, event.unit, -1, -1, -1, nan, _time(event.time)))
+        elif isinstance(event, TurnStarted):
+            self.turn = event.turn
+        elif isinstance(event, TurnsWarped):
+            self.turn = event.last
+            records.append((event.last, WARP, -1, -1, -1, event.first, nan, nan))
+        elif isinstance(event, SimulationStarted):
+            self.turn = event.turn
+            for unit in event.units:
+                records.append((event.turn, SPAWN, unit.id, unit.row, unit.col, unit.side,
+                                unit.life_points, nan))
+        elif isinstance(event, SimulationFinished):
+            self.flush()
+            return
+
+        if len(records) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            data = array(self.records, dtype=RECORD).tobytes()
+            if self.compress:
+                data = zlib.compress(data)
+                self.file.write(_CHUNK.pack(len(data), len(self.records)))
+            self.file.write(data)
+            self.records = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.owned:
+            self.file.close()
+
+
+# Leer una traza como arreglo estructurado de NumPy con los campos de RECORD. Si no esta
+# comprimida se mapea en memoria sin leerla; si lo esta se descomprime bloque a bloque.
+def read_replay(path):
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise Exception("Not a replay trace")
+        magic, version, flags, size = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise Exception("Not a replay trace")
+        if version != VERSION or size != RECORD.itemsize:
+            raise Exception(f"Unsupported replay version {version}")
+
+        if flags & COMPRESSED:
+            chunks = []
+            head = file.read(_CHUNK.size)
+            while head:
+                length, count = _CHUNK.unpack(head)
+                chunk = frombuffer(zlib.decompress(file.read(length)), dtype=RECORD)
+                if len(chunk) != count:
+                    raise Exception("Corrupted replay trace")
+                chunks.append(chunk)
+                head = file.read(_CHUNK.size)
+            return concatenate(chunks) if chunks else empty(0, dtype=RECORD)
+
+        file.seek(0, 2)
+        if file.tell() == _HEADER.size:
+            return empty(0, dtype=RECORD)
+    return memmap(path, dtype=RECORD, mode="r", offset=_HEADER.size)
+
+
+# Unidad reconstruida por el ReplayPlayer, lo justo para ocupar una celda del mapa. La traza no
+# guarda los rangos, asi que no amenaza ninguna celda en los ThreatMap del mapa: con el rango
+# minimo mayor que el maximo la zona de alcance queda vacia.
+class ReplayUnit:
+    min_range = 1
+    max_range = 0
+
+    def __init__(self, id: int, side: int):
+        self.id = id
+        self.side = side
+
+    def grid_side(self) -> int:
+        return self.side
+
+
+# ultima aparicion de cada clave, en el orden de la traza
+def _last(keys):
+    _, first = unique(keys[::-1], return_index=True)
+    return len(keys) - 1 - first
+
+
+# Reproduce una traza sin volver a simular: reconstruye la posicion y los puntos de vida de las
+# unidades despues de cada turno y, si se da un LandMap, las coloca en el. Cada keyframe_interval
+# turnos guarda una copia del estado, por lo que ir a un turno cuesta a lo sumo los registros de
+# un intervalo. Los registros de un tramo se aplican de una vez: de cada unidad solo cuenta el
+# ultimo movimiento y el ultimo golpe.
+class ReplayPlayer:
+
+    def __init__(self, trace, land=None, keyframe_interval: int = 100):
+        self.trace = read_replay(trace) if _is_path(trace) else trace
+        self.land = land
+        self.keyframe_interval = keyframe_interval
+
+        turns = self.trace["turn"]
+        actions = self.trace["action"]
+        spawns = self.trace[actions == SPAWN]
+        self.ids, first = unique(spawns["unit"], return_index=True)
+        self.sides = spawns["target"][first]
+        self.first_turn = int(turns[0]) if len(turns) else 0
+        self.last_turn = int(turns[-1]) if len(turns) else 0
+
+        self.rows = full(len(self.ids), -1, int64)
+        self.cols = full(len(self.ids), -1, int64)
+        self.life_points = full(len(self.ids), 0, float64)
+        self.turn = self.first_turn - 1
+        self.units = [ReplayUnit(int(id), int(side))
+                      for id, side in zip(self.ids.tolist(), self.sides.tolist())]
+        self.placed = full(len(self.ids), False)
+        self.cells = (self.rows.copy(), self.cols.copy())
+
+        # keyframes en first_turn, first_turn + keyframe_interval, ...
+        self.keyframes = []
+        for turn in range(self.first_turn, self.last_turn + 1, keyframe_interval):
+            self.advance(turn)
+            self.keyframes.append((turn, self.rows.copy(), self.cols.copy(),
+                                   self.life_points.copy()))
+        if self.keyframes:
+            self.restore(0)
+        self.sync()
+
+    # registros hasta el final del turno dado
+    def end(self, turn: int) -> int:
+        return int(searchsorted(self.trace["turn"], turn, side="right"))
+
+    # aplicar los registros de los turnos siguientes al actual hasta turn
+    def advance(self, turn: int):
+        span = self.trace[self.end(self.turn):self.end(turn)]
+        self.turn = turn
+        if not len(span):
+            return
+
+        actions = span["action"]
+        positions = span[(actions == SPAWN) | (actions == MOVE)]
+        positions = positions[isin(positions["unit"], self.ids)]
+        k = _last(positions["unit"])
+        units = searchsorted(self.ids, positions["unit"][k])
+        self.rows[units] = positions["row"][k]
+        self.cols[units] = positions["col"][k]
+
+        lives = span[(actions == SPAWN) | (actions == HIT)]
+        lives = lives[isin(lives["unit"], self.ids)]
+        k = _last(lives["unit"])
+        self.life_points[searchsorted(self.ids, lives["unit"][k])] = lives["value"][k]
+
+    # volver al estado del keyframe k
+    def restore(self, k: int):
+        self.turn, rows, cols, life_points = self.keyframes[k]
+        self.rows[:] = rows
+        self.cols[:] = cols
+        self.life_points[:] = life_points
+
+    # unidades vivas y colocadas en el mapa
+    def alive(self):
+        return (self.life_points > 0) & (self.rows >= 0)
+
+    # Actualizar el mapa con el estado actual. Solo se vacian y se vuelven a colocar las unidades
+    # que cambiaron de celda o murieron.
+    def sync(self):
+        if self.land is None:
+            return
+        alive = self.alive()
+        cells = self.cells
+        moved = (self.rows != cells[0]) | (self.cols != cells[1])
+        changed = (alive != self.placed) | (alive & moved)
+        for k in (changed & self.placed).nonzero()[0].tolist():
+            self.land.vacate(int(cells[0][k]), int(cells[1][k]))
+        for k in (changed & alive).nonzero()[0].tolist():
+            self.land.place(self.units[k], int(self.rows[k]), int(self.cols[k]))
+        self.placed = alive
+        self.cells = (self.rows.copy(), self.cols.copy())
+
+    # Ir al estado despues del turno dado, partiendo del estado actual si esta en el mismo
+    # intervalo y antes del turno, o si no del keyframe anterior.
+    def seek(self, turn: int):
+        turn = min(max(turn, self.first_turn), self.last_turn)
+        k = (turn - self.first_turn) // self.keyframe_interval
+        if self.keyframes and not self.keyframes[k][0] <= self.turn <= turn:
+            self.restore(k)
+        self.advance(turn)
+        self.sync()
+        return self
+
+    # avanzar turno a turno (o de step en step) sin simular, devolviendo el turno de cada cuadro
+    def frames(self, first: int = None, last: int = None, step: int = 1):
+        first = self.first_turn if first is None else first
+        last = self.last_turn if last is None else min(last, self.last_turn)
+        for turn in range(first, last + 1, step):
+            self.seek(turn)
+            yield turn
@@ -0,0 +1,188 @@
+import copy
+from typing import List
+from .sides import Side
+from ..objects.store import unit_state, base_class, new_unit
+from .activity import ActivityManager
+from ..maps.maps import Map, Cell
+from ..maps.threat import ThreatMap
+from ..maps.spatial import SpatialIndex
+
+
+# Mapa de una franja de filas del mapa completo, con las celdas en coordenadas locales.
+class ShardMap(Map):
+
+    def __init__(self, passable: List, height: List, types: List):
+        Map.__init__(self, len(passable), len(passable[0]))
+        self.matrix = [[Cell(passable[i][j], types[i][j], i, j, height[i][j])
+                        for j in range(self.no_columns)] for i in range(self.no_rows)]
+        self.attach()
+
+
+# Copias de las unidades sin mapa, celda, bando ni celdas visitadas, para enviarlas a otro proceso.
+# Son instancias nuevas de la clase original con los atributos copiados, aunque la unidad sea una
+# vista de un UnitStore, asi que cambiarlas no toca la unidad ni su almacen.
+def strip_units(units: List) -> List:
+    replicas = []
+    for unit in units:
+        replica = new_unit(base_class(unit))
+        replica.__dict__.update(unit_state(unit))
+        replica.map = None
+        replica.cell = None
+        replica.side = None
+        replica.visited_cells = set()
+        replica.streams = copy.deepcopy(unit.streams)
+        replicas.append(replica)
+    return replicas
+
+
+# terreno (transitabilidad, altura y tipo) de las filas first..last del mapa
+def terrain_rows(land, first: int, last: int):
+    return tuple([[getattr(land[i][j], name) for j in range(land.no_columns)]
+                  for i in range(first, last)] for name in ("passable", "height", "type"))
+
+
+# Copia de la simulacion en otro proceso, para decidir por las unidades sin enviar el mapa en cada
+# turno. Tiene una copia de todas las unidades y el terreno de las filas desde first_row; en cada
+# turno recibe la posicion y los puntos de vida de las unidades que estan en esas filas y el
+# estado de las que le toca decidir. Los atributos de las unidades que no se envian son los que
+# tenian al crear la copia.
+class Replica:
+
+    def __init__(self, units: List, side_ids: List[int], first_row: int, terrain):
+        self.units = units
+        self.first_row = first_row
+        self.land = ShardMap(*terrain)
+        self.sides = {}
+        for id in sorted(set(side_ids)):
+            members = [unit for unit, side_id in zip(units, side_ids) if side_id == id]
+            side = self.sides[id] = Side(id, members)
+            side.threat_map = ThreatMap(self.land, id)
+            self.land.observers.append(side.threat_map)
+        for unit in units:
+            unit.map = self.land
+
+        self.activity = ActivityManager()
+        self.placed = []
+        self.positions = {}
+        self.moved = set()
+        # epoca de las celdas visitadas de cada unidad (ver VisitedLog)
+        self.epochs = {}
+
+    # colocar las unidades dadas (indices en units) y calcular las distancias a los enemigos
+    def update(self, indices, rows, cols, life_points):
+        land = self.land
+        for unit in self.placed:
+            land.vacate(unit.cell.row, unit.cell.col)
+            unit.cell = None
+        self.placed = []
+        self.moved = set()
+        for k, row, col, life in zip(indices.tolist(), rows.tolist(), cols.tolist(),
+                                     life_points.tolist()):
+            unit = self.units[k]
+            unit.life_points = life
+            land.place(unit, row - self.first_row, col)
+            unit.cell = land[row - self.first_row][col]
+            self.placed.append(unit)
+            if self.positions.get(k, (row, col)) != (row, col):
+                self.moved.add(k)
+            self.positions[k] = (row, col)
+
+        sides = list(self.sides.values())
+        for side in sides:
+            side.alive_units = {unit: None for unit in self.placed if unit.side is side}
+        SpatialIndex(sides).update_enemy_distances()
+        self.activity.update(sides)
+
+    # Intenciones de las unidades dadas, con las filas en coordenadas globales. visited tiene las
+    # celdas visitadas completas de las unidades que las necesitan; a las demas se les agrega la
+    # celda a la que se movieron desde el turno anterior.
+    def decide(self, deciders, recharging, states, visited: dict):
+        land = self.land
+        first_row = self.first_row
+        intents = []
+        for k, turns, state in zip(deciders.tolist(), recharging.tolist(), states.tolist()):
+            unit = self.units[k]
+            if k in visited:
+                unit.visited_cells = {land[row - first_row][col] for row, col in visited[k]
+                                      if 0 <= row - first_row < land.no_rows}
+            elif k in self.moved:
+                unit.visited_cells.add(unit.cell)
+            unit.turns_recharging = turns
+            unit.streams.estimate.setstate(state)
+
+            intent = unit.decide()
+            if intent.row >= 0:
+                intent = intent._replace(row=intent.row + first_row)
+            intents.append(intent)
+        return intents
+
+    # Completar las celdas visitadas con las ultimas de cada unidad, (epoca, total, celdas) como
+    # las da VisitedLog.tail. Devuelve False si a alguna le siguen faltando celdas porque este
+    # proceso no la vio en los ultimos turnos.
+    def catch_up(self, tails: dict) -> bool:
+        land = self.land
+        complete = True
+        for k, (epoch, size, cells) in tails.items():
+            unit = self.units[k]
+            if self.epochs.get(k) != epoch:
+                self.epochs[k] = epoch
+                unit.visited_cells = set()
+            unit.visited_cells.update(land[row][col] for row, col in cells)
+            complete = complete and len(unit.visited_cells) == size
+        return complete
+
+
+# Celdas visitadas de las unidades en el orden en que se agregaron, del lado del coordinador de
+# un pool. A cada copia se le envian solo las ultimas window, que alcanzan si el proceso decidio
+# por la unidad hace poco; si no, la copia lo avisa y se le reenvian todas. Si el conjunto de una
+# unidad se reemplaza (al restaurar un checkpoint) empieza otra epoca y las copias lo rehacen.
+class VisitedLog:
+
+    def __init__(self, window: int = 32):
+        self.window = window
+        self.logs = {}
+
+    # (epoca, total, ultimas celdas) de la unidad k, o todas las celdas si full
+    def tail(self, k: int, unit, full: bool = False):
+        visited = unit.visited_cells
+        entry = self.logs.get(k)
+        if entry is None or entry[1] is not visited or len(entry[2]) > len(visited):
+            epoch = entry[0] + 1 if entry is not None else 0
+            entry = self.logs[k] = [epoch, visited, list(visited), set(visited)]
+        epoch, _, log, known = entry
+        if len(log) < len(visited):
+            # lo normal es que solo se agregue la celda a la que se movio
+            if len(visited) == len(log) + 1 and unit.cell in visited and unit.cell not in known:
+                added = [unit.cell]
+            else:
+                added = [cell for cell in visited if cell not in known]
+            log.extend(added)
+            known.update(added)
+        cells = log if full else log[-self.window:]
+        return epoch, len(log), [(cell.row, cell.col) for cell in cells]
+
+
+# copias de la simulacion que tiene cada proceso de un pool, por clave de simulacion; se guardan
+# las de las ultimas MAX_REPLICAS simulaciones que usaron el proceso
+_REPLICAS = {}
+MAX_REPLICAS = 4
+
+
+# Decidir un grupo de unidades en un proceso de un pool (ProcessPoolExecutor). La copia de la
+# simulacion se crea la primera vez que el proceso recibe un grupo con la clave. El grupo trae las
+# ultimas celdas visitadas de cada unidad (VisitedLog). Si no tiene la copia y no vino el
+# escenario, o si le faltan celdas visitadas, devuelve None y el coordinador reenvia el grupo con
+# el escenario y todas las celdas.
+def decide_replica(key, scenario, placement, group):
+    replica = _REPLICAS.get(key)
+    if replica is None:
+        if scenario is None:
+            return None
+        if len(_REPLICAS) >= MAX_REPLICAS:
+            del _REPLICAS[next(iter(_REPLICAS))]
+        replica = _REPLICAS[key] = Replica(*scenario)
+    replica.update(*placement)
+    deciders, recharging, states, tails = group
+    if not replica.catch_up(tails):
+        return None
+    return replica.decide(deciders, recharging, states, {})
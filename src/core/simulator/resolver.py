@@ -0,0 +1,58 @@
+from os import cpu_count
+from typing import List, NamedTuple
+
+# acciones que puede decidir una unidad
+ATTACK_ACTION = "attack"
+MOVE_ACTION = "move"
+HOLD_ACTION = "hold"
+
+
+# Intencion de una unidad para el turno, calculada sin modificar el mapa. Solo guarda ids y
+# posiciones, y el estado del flujo de estimacion despues de decidir, para que se pueda calcular
+# en otro hilo o en otro proceso y aplicarse despues sobre la unidad original.
+class Intent(NamedTuple):
+    unit: int
+    action: str
+    row: int = -1
+    col: int = -1
+    target: int = -1
+    estimate: int = 0
+
+
+# decidir las intenciones de un grupo de unidades
+def decide(units: List) -> List[Intent]:
+    return [unit.decide() for unit in units]
+
+
+# Decidir las intenciones de todas las unidades leyendo el mapa sin modificarlo. Con un executor
+# de hilos las unidades se reparten en un grupo por hilo, todos sobre el mismo mapa.
+def decide_all(units: List, executor=None) -> List[Intent]:
+    if executor is None or len(units) < 2:
+        return decide(units)
+
+    size = -(-len(units) // workers_of(executor))
+    groups = [units[k:k + size] for k in range(0, len(units), size)]
+    return [intent for group in executor.map(decide, groups) for intent in group]
+
+
+# cantidad de trabajadores de un executor de concurrent.futures
+def workers_of(executor) -> int:
+    return getattr(executor, "_max_workers", None) or cpu_count() or 1
+
+
+# Si la clase de la unidad redefine turn sin redefinir decide (por ejemplo una clase generada desde
+# BattleScript), los turnos simultaneos no usarian su turn.
+def overrides_turn(unit) -> bool:
+    cls = type(unit)
+    turn = next((c for c in cls.__mro__ if "turn" in c.__dict__), None)
+    decide = next((c for c in cls.__mro__ if "decide" in c.__dict__), None)
+    return turn is not None and decide is not None and turn is not decide \
+        and issubclass(turn, decide)
+
+
+# Orden determinista en que se aplican las intenciones, dadas en el orden de los tiempos de sus
+# eventos: primero los ataques y despues los movimientos y esperas, cada grupo por tiempo.
+def resolution_order(intents: List[Intent]) -> List[int]:
+    attacks = [k for k, intent in enumerate(intents) if intent.action == ATTACK_ACTION]
+    others = [k for k, intent in enumerate(intents) if intent.action != ATTACK_ACTION]
+    return attacks + others
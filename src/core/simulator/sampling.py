@@ -0,0 +1,19 @@
+from numpy import cbrt
+from ...utils.rng import RandomStreams, TIMING
+
+
+# Muestreo de los tiempos de accion de un turno con numeros aleatorios comunes. Los tiempos siguen
+# una Beta(1, 3) desplazada al momento del turno; se generan todos de una vez por inversion de la
+# distribucion acumulada: si U ~ U(0, 1) entonces 1 - U^(1/3) ~ Beta(1, 3). El tiempo de cada
+# unidad depende solo de la semilla, el momento y el id de la unidad, no de cuantas unidades haya
+# ni en que orden se planifiquen.
+class CommonTimeSampler:
+
+    def __init__(self, streams: RandomStreams):
+        self.streams = streams
+
+    def uniforms(self, moment: float, units):
+        return self.streams.uniforms(TIMING, int(moment), [unit.id for unit in units])
+
+    def sample(self, moment: float, units):
+        return moment + 1.0 - cbrt(self.uniforms(moment, units))
@@ -0,0 +1,61 @@
+from heapq import heappush, heappop
+from itertools import count
+from typing import Callable, List, Optional, Tuple
+
+
+# Cola de prioridad de eventos de la simulacion. Cada entrada es (turno, tiempo, orden, unidad).
+# Las unidades muertas no se sacan de la cola al morir, se descartan cuando llegan al frente.
+class EventScheduler:
+
+    def __init__(self, is_alive: Callable = None):
+        self.is_alive = is_alive if is_alive is not None else lambda unit: unit.life_points > 0
+        self.heap = []
+        self.counter = count()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __bool__(self) -> bool:
+        return len(self.heap) > 0
+
+    # planificar la proxima accion de una unidad
+    def schedule(self, unit, turn: int, time: float):
+        heappush(self.heap, (turn, time, next(self.counter), unit))
+
+    # turno del proximo evento o None si la cola esta vacia
+    def next_turn(self) -> Optional[int]:
+        self.drop_dead()
+        if self.heap:
+            return self.heap[0][0]
+        return None
+
+    # sacar el proximo evento del turno dado, None si ya no quedan
+    def pop(self, turn: int) -> Optional[Tuple[float, object]]:
+        while self.heap and self.heap[0][0] == turn:
+            _, time, _, unit = heappop(self.heap)
+            if self.is_alive(unit):
+                return time, unit
+        return None
+
+    # sacar las unidades vivas planificadas antes del turno dado, por ejemplo si se saltaron turnos
+    def pop_before(self, turn: int) -> List:
+        units = []
+        while self.heap and self.heap[0][0] < turn:
+            unit = heappop(self.heap)[3]
+            if self.is_alive(unit):
+                units.append(unit)
+        return units
+
+    # sacar todas las unidades vivas planificadas, dejando la cola vacia
+    def drain(self) -> List:
+        units = [entry[3] for entry in sorted(self.heap) if self.is_alive(entry[3])]
+        self.heap = []
+        return units
+
+    # descartar las unidades muertas que esten al frente de la cola
+    def drop_dead(self):
+        while self.heap and not self.is_alive(self.heap[0][3]):
+            heappop(self.heap)
+
+    def clear(self):
+        self.heap = []
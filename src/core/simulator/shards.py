@@ -0,0 +1,128 @@
+from multiprocessing import Pipe, Process
+from os import cpu_count
+from typing import List
+from numpy import array, fromiter, searchsorted, int64, float64, uint64
+from .simulator import Simulator
+from .replica import Replica, strip_units, terrain_rows
+from ..maps.geometry import MAX_STEP
+
+
+# Proceso de una franja. En su copia de la simulacion solo coloca las unidades que estan en la
+# franja y en el halo que la rodea. En cada turno recibe el estado de esas unidades y las unidades
+# que le tocan decidir, y devuelve sus intenciones en coordenadas globales.
+def shard_worker(conn, units: List, side_ids: List[int], first_row: int, terrain):
+    replica = Replica(units, side_ids, first_row, terrain)
+    message = conn.recv()
+    while message is not None:
+        placement, group = message
+        replica.update(*placement)
+        conn.send(replica.decide(*group))
+        message = conn.recv()
+    conn.close()
+
+
+# Simulacion por turnos simultaneos repartida en procesos. El mapa se divide en franjas de filas,
+# cada una de un proceso que decide por las unidades que estan en ella. Cada proceso ve ademas un
+# halo de filas alrededor de su franja, mas ancho que la mayor vision, para que las decisiones sean
+# las mismas que con Simulator(simultaneous=True). Las unidades migran de proceso al cruzar el borde
+# de una franja. El coordinador aplica las decisiones y lleva el estado, como en el Simulator.
+# Las clases de las unidades tienen que poder serializarse.
+class ShardedSimulator(Simulator):
+
+    def __init__(self, earth_map, sides: List, turns: int, interval: int, time_beg=0, seed=None,
+                 sink=None, shards: int = None, event_driven=False, store=None):
+        Simulator.__init__(self, earth_map, sides, turns, interval, time_beg, seed, sink,
+                           store=store, simultaneous=True, event_driven=event_driven)
+        self.shards = shards or cpu_count() or 1
+        self.workers = []
+        self.bounds = None
+        self.windows = []
+        self.decided = []
+
+    # arrancar los procesos de las franjas
+    def open(self):
+        land = self.earth_map
+        halo = max((unit.vision for unit in self.units), default=0) + MAX_STEP + 2
+        shards = max(1, min(self.shards, land.no_rows))
+        self.bounds = array([land.no_rows * k // shards for k in range(shards + 1)], dtype=int64)
+
+        replicas = strip_units(self.units)
+        side_ids = [unit.side.id for unit in self.units]
+
+        for k in range(shards):
+            first = max(int(self.bounds[k]) - halo, 0)
+            last = min(int(self.bounds[k + 1]) + halo, land.no_rows)
+            terrain = terrain_rows(land, first, last)
+            conn, child = Pipe()
+            worker = Process(target=shard_worker, args=(child, replicas, side_ids, first, terrain),
+                             daemon=True)
+            worker.start()
+            child.close()
+            self.workers.append((worker, conn))
+            self.windows.append((first, last))
+            self.decided.append(set())
+
+    # terminar los procesos de las franjas
+    def close(self):
+        for worker, conn in self.workers:
+            conn.send(None)
+            conn.close()
+            worker.join()
+        self.workers = []
+        self.windows = []
+        self.decided = []
+
+    def decide(self, units):
+        if not self.workers:
+            self.open()
+
+        every = self.units
+        n = len(every)
+        alive = fromiter((unit.life_points > 0 and unit.cell is not None for unit in every), bool,
+                         n)
+        rows = fromiter((unit.cell.row if unit.cell is not None else -1 for unit in every), int64,
+                        n)
+        cols = fromiter((unit.cell.col if unit.cell is not None else -1 for unit in every), int64,
+                        n)
+        life_points = fromiter((unit.life_points for unit in every), float64, n)
+
+        indices = array([self.index[id(unit)] for unit in units], dtype=int64)
+        owners = searchsorted(self.bounds, rows[indices], side="right") - 1
+
+        assigned = []
+        for k, (worker, conn) in enumerate(self.workers):
+            first, last = self.windows[k]
+            inside = (alive & (rows >= first) & (rows < last)).nonzero()[0]
+            positions = (owners == k).nonzero()[0]
+            deciders = indices[positions]
+            group = [every[i] for i in deciders.tolist()]
+            recharging = fromiter((unit.turns_recharging for unit in group), int64, len(group))
+            states = fromiter((unit.streams.estimate.getstate() for unit in group), uint64,
+                              len(group))
+            visited = {i: [(cell.row, cell.col) for cell in every[i].visited_cells]
+                       for i in deciders.tolist() if i not in self.decided[k]}
+            self.decided[k] = set(deciders.tolist())
+
+            placement = (inside, rows[inside], cols[inside], life_points[inside])
+            conn.send((placement, (deciders, recharging, states, visited)))
+            assigned.append(positions)
+
+        intents = [None] * len(units)
+        for (worker, conn), positions in zip(self.workers, assigned):
+            for position, intent in zip(positions.tolist(), conn.recv()):
+                intents[position] = intent
+        return intents
+
+    # start, iter_turns y run_async avanzan con turn_steps, asi que los procesos se terminan al
+    # acabar, al dejar de iterar o ante un error
+    def turn_steps(self, checkpoint=None, every=0):
+        try:
+            yield from Simulator.turn_steps(self, checkpoint, every)
+        finally:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -3,23 +3,46 @@ class Side:
     def no_units(self) -> int:
         return len(self.units)
 
+    @property
+    def no_alive_units(self) -> int:
+        return len(self.alive_units)
+
     def __init__(self, id, units):
         self.id = id
         self.name = f'Bando {self.id}'
         self.units = units
         self.no_own_units_defeated = 0
         self.no_enemy_units_defeated = 0
-        
+        # indice de unidades vivas, se actualiza cuando una unidad muere
+        self.alive_units = {}
+        # mapa de amenaza enemiga (ThreatMap), lo asigna el Simulator
+        self.threat_map = None
+
         for unit in self.units:
             unit.side=self
+        self.reset_alive()
 
     def add_unit(self, unit):
         unit.side = self
         self.units.append(unit)
+        if unit.life_points > 0:
+            self.alive_units[unit] = None
 
     def remove_unit(self, unit):
         unit.side = None
         self.units.remove(unit)
+        self.alive_units.pop(unit, None)
+
+    # reconstruir el indice de unidades vivas a partir de los puntos de vida
+    def reset_alive(self):
+        self.alive_units = {unit: None for unit in self.units if unit.life_points > 0}
+
+    # avisar que una unidad del bando fue destruida
+    def unit_defeated(self, unit):
+        self.alive_units.pop(unit, None)
+
+    def get_alive_units(self):
+        return list(self.alive_units)
 
     def get_units(self):
         return self.units
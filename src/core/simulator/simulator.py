@@ -1,10 +1,33 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
 from typing import List
-from scipy import stats
+from uuid import uuid4
+from numpy import fromiter, int64, float64, uint64
 from .sides import Side
-from tabulate import tabulate
+from .scheduler import EventScheduler
+from .sampling import CommonTimeSampler
+from .events import snapshot, SimulationStarted, TurnStarted, TurnEnded, TurnsWarped, UnitMoved, \
+    SimulationFinished
+from .sinks import EventSink, TextSink
+from .stream import TurnRecorder
+from .checkpoint import save_checkpoint, load_checkpoint
+from .resolver import decide_all, resolution_order, workers_of, overrides_turn
+from .replica import decide_replica, strip_units, terrain_rows, VisitedLog
+from .activity import ActivityManager
+from .warp import free_turns, warp
+from ...utils.rng import RandomStreams
+from ..maps.threat import ThreatMap
+from ..maps.spatial import SpatialIndex
 
 class Simulator:
-    def __init__(self,earth_map, sides: List, turns: int, interval: int, time_beg=0):
+    # sumidero de las simulaciones que no reciben uno; se puede cambiar por una funcion sin
+    # argumentos (como staticmethod) para redirigir la salida de escenarios que no se controlan
+    sink_factory=TextSink
+
+    def __init__(self,earth_map, sides: List, turns: int, interval: int, time_beg=0, seed=None,
+                 sink: EventSink = None, store=None, simultaneous=False, executor=None,
+                 event_driven=False, warp=False):
         self.earth_map=earth_map
         self.sides=sides
         self.units=[]
@@ -12,6 +35,28 @@ class Simulator:
         self.interval=interval
         self.turns=turns
         self.no_enemies=False
+        self.turn=0
+        self.time=time_beg
+        self.scheduler=EventScheduler(self.event_is_pos)
+        self.sink=sink if sink is not None else self.sink_factory()
+        # con simultaneous todas las unidades deciden sobre el mismo estado del mapa (en paralelo
+        # si se da un executor) y despues se aplican las decisiones
+        self.simultaneous=simultaneous
+        self.executor=executor
+        # clave y escenario de las copias de la simulacion en los procesos de un ProcessPoolExecutor
+        self.replica_key=None
+        self.replica_scenario=None
+        self.visited_log=VisitedLog()
+        # con event_driven las unidades inmoviles que estan recargando no se despiertan hasta el
+        # turno en que pueden volver a atacar, y el reloj salta los turnos sin eventos
+        self.event_driven=event_driven
+        # con warp los turnos en que ningun bando puede alcanzar al otro se adelantan con un
+        # modelo de movimiento en bloque (aproximado), hasta antes del primer contacto
+        self.warp=warp
+        # las unidades sin enemigos cerca deciden por el camino corto
+        self.activity=ActivityManager()
+        # indice espacial de las posiciones actuales, si ya se construyo en el turno
+        self.spatial=None
 
         for side in sides:
             units=side.get_units()
@@ -19,6 +64,49 @@ class Simulator:
             for unit in units:
                 self.units.append(unit)
 
+        # toda la aleatoriedad de la simulacion sale de self.streams, dividido por unidad y
+        # proposito
+        self.streams=seed if isinstance(seed, RandomStreams) else RandomStreams(seed)
+        self.sampler=CommonTimeSampler(self.streams)
+        for unit in self.units:
+            unit.streams=self.streams.unit(unit.id)
+
+        for side in sides:
+            side.reset_alive()
+        # cada bando lleva la cuenta de la amenaza enemiga sobre cada celda
+        for side in sides:
+            if side.threat_map in earth_map.observers:
+                earth_map.observers.remove(side.threat_map)
+            side.threat_map=ThreatMap(earth_map, side.id)
+            earth_map.observers.append(side.threat_map)
+
+        # los bandos pueden haberse asignado despues de colocar las unidades
+        earth_map.refresh_occupancy()
+
+        # almacen columnar opcional (UnitStore) con el estado de las unidades
+        self.store=store
+        if store is not None:
+            for unit in self.units:
+                store.add(unit)
+
+        # unidades pendientes de planificar su proxima accion
+        self.pending=list(self.units)
+        self.index={id(unit): k for k, unit in enumerate(self.units)}
+
+        if simultaneous:
+            for unit in self.units:
+                if overrides_turn(unit):
+                    raise Exception(f"Unit {unit.id} redefines turn and cannot play "
+                                    f"simultaneous turns")
+
+    # unidades vivas de todos los bandos
+    def alive_units(self):
+        for side in self.sides:
+            yield from side.alive_units
+
+    def no_alive_sides(self):
+        return sum(1 for side in self.sides if side.alive_units)
+
     def event_is_pos(self,unit):
         if unit.life_points<=0: #Saber si la unidad se destruyó según las condiciones del usuario
             return False
@@ -26,61 +114,286 @@ class Simulator:
         return True
 
     def get_events(self,moment):
-        events={}
+        units=[unit for unit in self.pending if self.event_is_pos(unit)]
+        times=self.sampler.sample(moment, units)
+
+        for unit, var_time in zip(units, times.tolist()):
+            self.scheduler.schedule(unit, self.turn, var_time)
+        self.pending=[]
+
+        return self.scheduler
+
+    # una unidad inmovil que recarga solo espera hasta poder atacar de nuevo
+    def is_waiting(self,unit):
+        return not unit.movil and unit.turns_recharging>0
+
+    # Planificar las unidades pendientes que esperan directamente en el turno en que termina su
+    # recarga, con el tiempo que se les habria muestreado en ese turno. La espera queda en el turno
+    # del evento, asi que el contador de recarga pasa a 0.
+    def schedule_waiting(self):
+        waiting=[unit for unit in self.pending if self.event_is_pos(unit) and self.is_waiting(unit)]
+        self.pending=[unit for unit in self.pending if not self.is_waiting(unit)]
+
+        wakes={}
+        for unit in waiting:
+            wakes.setdefault(self.turn+unit.turns_recharging, []).append(unit)
+            unit.turns_recharging=0
+
+        for wake, group in wakes.items():
+            begin=self.time_at(wake)
+            times=self.sampler.sample((begin+int(begin+self.interval))//2, group)
+            for unit, var_time in zip(group, times.tolist()):
+                self.scheduler.schedule(unit, wake, var_time)
+
+    # tiempo al empezar un turno futuro
+    def time_at(self,turn):
+        time=self.time
+        for _ in range(turn-self.turn):
+            time=int(time+self.interval)
+        return time
+
+    # turnos seguidos sin ningun evento a partir del actual
+    def idle_turns(self):
+        if any(self.event_is_pos(unit) for unit in self.pending):
+            return 0
+        next_turn=self.scheduler.next_turn()
+        if next_turn is None:
+            return self.turns-self.turn
+        return min(next_turn, self.turns)-self.turn
+
+    # adelantar con el modelo en bloque los turnos sin interaccion posible, a lo sumo k
+    def warp_turns(self,k):
+        # el indice sirve tambien para el turno normal si no se adelanta ninguno
+        self.spatial=SpatialIndex(self.sides)
+        self.spatial.update_enemy_distances()
+        turns=min(free_turns(self.sides, self.spatial), k)
+        if turns<2:
+            return 0
+        self.spatial=None
+
+        units=list(self.alive_units())
+        cells=[unit.cell for unit in units]
+        warp(self.earth_map, units, turns)
+        self.pending.extend(self.scheduler.pop_before(self.turn+turns))
+
+        # solo se informa la posicion final de las unidades que se movieron
+        self.sink.emit(TurnsWarped(self.turn+1, self.turn+turns))
+        for unit, cell in zip(units, cells):
+            if unit.cell is not cell:
+                self.sink.emit(UnitMoved(unit.id, unit.cell.row, unit.cell.col))
+        return turns
 
-        for unit in self.units:
-            if self.event_is_pos(unit):
-                events[unit]=0
-
-        print("Life points")
-        print(tabulate([list(map(lambda x: x.life_points, self.units))], headers=[f"Unit {u.id}" for u in self.units]))
-        print("Time - Action")
-
-        for event in events:
-            var_time=stats.beta.rvs(1, 3, loc=moment, scale=1, size=1, random_state=None)
-                
-            var_time=var_time[0]
-            events[event]=var_time
-
-        sorted_events = sorted(events.items(), key=lambda x: x[1])
-        
-        return sorted_events
-            
     def simulator_by_turns(self,time_beg,time_end):
 
         events=self.get_events((time_beg+time_end)//2)
 
-        alive_sides=set()
-        for event in events:
-            alive_sides.add(event[0].side)
-
-        if len(alive_sides)<=1:
+        if self.no_alive_sides()<=1:
             self.no_enemies=True
+            # la batalla termino: las acciones planificadas no se ejecutan
+            self.pending.extend(events.drain())
             return
 
-        for event in events:
-            if self.event_is_pos(event[0]):
-                print(f"{event[1]}", end=" - ")
-                event[0].turn()
-        print()
+        # distancia al enemigo mas cercano de todas las unidades en una consulta por bando, salvo
+        # que ya se haya calculado en este turno al intentar adelantar turnos
+        if self.spatial is None:
+            SpatialIndex(self.sides).update_enemy_distances()
+        self.spatial=None
+        self.activity.update(self.sides)
+
+        if self.simultaneous:
+            self.simultaneous_turn(events)
+        else:
+            event=events.pop(self.turn)
+            while event is not None:
+                var_time, unit = event
+                action=unit.turn()
+                if action is not None:
+                    self.sink.emit(action._replace(time=var_time))
+                self.pending.append(unit)
+                event=events.pop(self.turn)
+        self.sink.emit(TurnEnded(self.turn + 1))
+        self.turn+=1
+
+    # Turno en dos fases: todas las unidades deciden sobre el mapa sin cambios y despues se aplican
+    # los ataques y luego los movimientos, cada grupo por tiempo. Las unidades que mueren antes de
+    # aplicar su decision no actuan y los movimientos a una celda ya ocupada se convierten en
+    # espera.
+    def simultaneous_turn(self, events):
+        turn_events=[]
+        event=events.pop(self.turn)
+        while event is not None:
+            turn_events.append(event)
+            event=events.pop(self.turn)
+
+        intents=self.decide([unit for _, unit in turn_events])
+
+        for k in resolution_order(intents):
+            var_time, unit = turn_events[k]
+            if self.event_is_pos(unit):
+                self.sink.emit(unit.apply(intents[k])._replace(time=var_time))
+        self.pending.extend(unit for _, unit in turn_events)
+
+    # intenciones de las unidades, en el mismo orden
+    def decide(self, units):
+        if isinstance(self.executor, ProcessPoolExecutor) and len(units) > 1:
+            return self.decide_in_processes(units)
+        return decide_all(units, self.executor)
+
+    # Decidir en los procesos del executor. Cada proceso guarda una copia de la simulacion (terreno
+    # y unidades) la primera vez que la recibe, y en cada turno solo se envian las posiciones, los
+    # puntos de vida, el estado y las ultimas celdas visitadas de las unidades que deciden.
+    def decide_in_processes(self, units):
+        if self.replica_key is None:
+            self.replica_key=uuid4().hex
+            land=self.earth_map
+            side_ids=[unit.side.id for unit in self.units]
+            self.replica_scenario=(strip_units(self.units), side_ids, 0,
+                                   terrain_rows(land, 0, land.no_rows))
+
+        every=self.units
+        n=len(every)
+        alive=fromiter((unit.life_points>0 and unit.cell is not None for unit in every), bool, n)
+        rows=fromiter((unit.cell.row if unit.cell is not None else -1 for unit in every), int64, n)
+        cols=fromiter((unit.cell.col if unit.cell is not None else -1 for unit in every), int64, n)
+        life_points=fromiter((unit.life_points for unit in every), float64, n)
+        inside=alive.nonzero()[0]
+        placement=(inside, rows[inside], cols[inside], life_points[inside])
+
+        size=-(-len(units)//workers_of(self.executor))
+        groups=[units[k:k+size] for k in range(0, len(units), size)]
+        futures=[self.executor.submit(decide_replica, self.replica_key, None, placement,
+                                      self.group(group)) for group in groups]
+        results=[future.result() for future in futures]
+        # los procesos que todavia no tienen la copia, o a los que les faltan celdas visitadas,
+        # reciben el grupo de nuevo con todo
+        missing={k: self.executor.submit(decide_replica, self.replica_key, self.replica_scenario,
+                                         placement, self.group(groups[k], full=True))
+                 for k, result in enumerate(results) if result is None}
+        for k, future in missing.items():
+            results[k]=future.result()
+        return [intent for result in results for intent in result]
+
+    # indices, recarga, estado del flujo de estimacion y celdas visitadas de un grupo de unidades
+    def group(self, units, full=False):
+        n=len(units)
+        indices=[self.index[id(unit)] for unit in units]
+        return (fromiter(indices, int64, n),
+                fromiter((unit.turns_recharging for unit in units), int64, n),
+                fromiter((unit.streams.estimate.getstate() for unit in units), uint64, n),
+                {k: self.visited_log.tail(k, unit, full) for k, unit in zip(indices, units)})
+
+    def simulating_k_turns(self, checkpoint=None, every=0):
+        for _ in self.turn_steps(checkpoint, every):
+            pass
 
-    def simulating_k_turns(self):
-        beg=self.time_beg
-        k=self.turns
+    # Simular hasta el ultimo turno, devolviendo despues de cada paso el primer turno que cubrio.
+    # Un paso es un turno o un salto de varios turnos sin eventos o adelantados.
+    def turn_steps(self, checkpoint=None, every=0):
+        k=self.turns-self.turn
         while(k>0):
-            end=int(beg+self.interval)
+            end=int(self.time+self.interval)
             if self.no_enemies:
-                print("Simulation Finished!")
-                result = [[f"Side {side.id}", side.no_own_units_defeated, side.no_enemy_units_defeated] for side in self.sides]
-                print(tabulate(result, headers=["Sides", "Allies Dead", "Enemies Killed"]))
-
+                self.sink.emit(SimulationFinished(self.sides))
                 return
 
+            # el reloj salta de una vez los turnos sin eventos o sin interaccion posible
+            idle=0
+            if self.event_driven:
+                self.schedule_waiting()
+                idle=self.idle_turns()
+            if idle==0 and self.warp and self.no_alive_sides()>1:
+                idle=self.warp_turns(k)
+            if idle>0:
+                self.time=self.time_at(self.turn+idle)
+                self.turn+=idle
+                k-=idle
+                if checkpoint is not None and every and self.turn//every>(self.turn-idle)//every:
+                    self.save_checkpoint(checkpoint)
+                yield self.turn-idle+1
+                continue
+
             k-=1
-            
-            print(f"Turn {self.turns - k}:")
-            self.simulator_by_turns(beg,end)
-            beg=end
 
-    def start(self):
-        self.simulating_k_turns()
+            units=snapshot(self.units) if self.sink.wants_snapshots else ()
+            self.sink.emit(TurnStarted(self.turn + 1, units))
+            self.simulator_by_turns(self.time,end)
+            self.time=end
+
+            if checkpoint is not None and every and self.turn % every == 0:
+                self.save_checkpoint(checkpoint)
+            if not self.no_enemies:
+                yield self.turn
+
+    # continua desde el turno actual, por lo que sirve tambien para reanudar un checkpoint
+    def start(self, checkpoint=None, every=0):
+        self.sink.emit(SimulationStarted(self.turn, snapshot(self.units)))
+        self.simulating_k_turns(checkpoint, every)
+        self.sink.flush()
+
+    # Como start, pero devuelve un TurnDelta despues de cada turno (o salto de turnos) para
+    # consumir la simulacion de a poco o detenerla antes. Los eventos siguen yendo al sumidero.
+    def iter_turns(self, checkpoint=None, every=0):
+        recorder=TurnRecorder(self.sink, self.units)
+        self.sink=recorder
+        steps=self.turn_steps(checkpoint, every)
+        try:
+            recorder.emit(SimulationStarted(self.turn, snapshot(self.units)))
+            for first in steps:
+                yield recorder.take(first, self)
+        finally:
+            steps.close()
+            self.sink=recorder.sink
+            self.sink.flush()
+
+    # Version asincrona de start: cede el bucle de eventos despues de cada turno, de modo que un
+    # mismo bucle puede llevar varias simulaciones a la vez.
+    async def run_async(self, checkpoint=None, every=0):
+        self.sink.emit(SimulationStarted(self.turn, snapshot(self.units)))
+        steps=self.turn_steps(checkpoint, every)
+        try:
+            for _ in steps:
+                await asyncio.sleep(0)
+        finally:
+            steps.close()
+        self.sink.flush()
+
+    # Version asincrona de iter_turns. La simulacion corre en otra tarea y deja los TurnDelta en
+    # una cola de maxsize elementos; si el consumidor se atrasa y la cola se llena, la simulacion
+    # espera. Al dejar de iterar se cancela la tarea y el sumidero queda como estaba.
+    async def aiter_turns(self, checkpoint=None, every=0, maxsize=1):
+        queue=asyncio.Queue(maxsize)
+
+        async def produce():
+            turns=self.iter_turns(checkpoint, every)
+            try:
+                for delta in turns:
+                    await queue.put(delta)
+                    await asyncio.sleep(0)
+            except Exception as error:
+                await queue.put(error)
+                return
+            finally:
+                turns.close()
+            await queue.put(None)
+
+        task=asyncio.ensure_future(produce())
+        try:
+            item=await queue.get()
+            while item is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                item=await queue.get()
+        finally:
+            # esperar a la tarea para que devuelva el sumidero antes de seguir
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    # guardar el estado mutable de la simulacion en un archivo o flujo binario
+    def save_checkpoint(self, file):
+        save_checkpoint(self, file)
+
+    # restaurar un checkpoint sobre una simulacion construida con el mismo escenario
+    def load_checkpoint(self, file):
+        load_checkpoint(self, file)
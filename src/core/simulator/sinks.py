@@ -0,0 +1,156 @@
+import sys
+from typing import Optional
+from abc import ABC, abstractmethod
+from time import monotonic
+from tabulate import tabulate
+from .events import *
+
+
+def _format_turn_started(event: TurnStarted) -> str:
+    table = tabulate([[unit.life_points for unit in event.units]],
+                     headers=[f"Unit {unit.id}" for unit in event.units])
+    return f"Turn {event.turn}:\nLife points\n{table}\nTime - Action"
+
+
+def _format_simulation_finished(event: SimulationFinished) -> str:
+    result = [[f"Side {side.id}", side.no_own_units_defeated, side.no_enemy_units_defeated]
+              for side in event.sides]
+    table = tabulate(result, headers=["Sides", "Allies Dead", "Enemies Killed"])
+    return "Simulation Finished!\n" + table
+
+
+_FORMATTERS = {
+    SimulationStarted: lambda event: None,
+    TurnStarted: _format_turn_started,
+    TurnEnded: lambda event: "",
+    UnitMoved: lambda event:
+        f"{event.time} - Unit {event.unit} moving to cell ({event.row}, {event.col})",
+    UnitAttacked: lambda event:
+        f"{event.time} - Unit {event.unit} attacks Unit {event.target} "
+        f"in cell ({event.row}, {event.col})",
+    UnitHeld: lambda event: f"{event.time} - Unit {event.unit} hold position",
+    TurnsWarped: lambda event: f"Turns {event.first} to {event.last} fast-forwarded",
+    SimulationFinished: _format_simulation_finished,
+}
+
+
+# convertir un evento en el texto que se mostraba por consola, None si no se muestra
+def format_event(event) -> Optional[str]:
+    return _FORMATTERS[type(event)](event)
+
+
+# Destino de los eventos. Con wants_snapshots en False los TurnStarted llegan sin el estado de
+# las unidades, que cuesta copiar todas las unidades en cada turno.
+class EventSink(ABC):
+    wants_snapshots = True
+
+    @abstractmethod
+    def emit(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+# descarta todos los eventos
+class NullSink(EventSink):
+    wants_snapshots = False
+
+    def emit(self, event):
+        pass
+
+
+# formatea los eventos como texto y los escribe en bloques de buffer_size lineas
+class TextSink(EventSink):
+
+    def __init__(self, stream=None, buffer_size: int = 256):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def emit(self, event):
+        text = format_event(event)
+        if text is not None:
+            self.buffer.append(text)
+        if len(self.buffer) >= self.buffer_size or isinstance(event, SimulationFinished):
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write("\n".join(self.buffer) + "\n")
+            self.stream.flush()
+            self.buffer = []
+
+
+# reenvia los eventos a varios sumideros
+class TeeSink(EventSink):
+
+    def __init__(self, *sinks: EventSink):
+        self.sinks = sinks
+
+    @property
+    def wants_snapshots(self) -> bool:
+        return any(sink.wants_snapshots for sink in self.sinks)
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+# guarda los eventos sin formatear para analizarlos despues
+class MemorySink(EventSink):
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def of_type(self, event_type) -> list:
+        return [event for event in self.events if isinstance(event, event_type)]
+
+
+# muestra como maximo rate eventos por segundo, el resto se cuentan y se descartan sin formatear
+class ConsoleSink(EventSink):
+
+    def __init__(self, rate: float = 20, stream=None):
+        self.rate = rate
+        self.stream = stream if stream is not None else sys.stdout
+        self.tokens = rate
+        self.last = monotonic()
+        self.dropped = 0
+
+    def emit(self, event):
+        if isinstance(event, SimulationFinished):
+            if self.dropped:
+                self.stream.write(f"... {self.dropped} events not shown\n")
+                self.dropped = 0
+            self.stream.write(format_event(event) + "\n")
+            return
+
+        if isinstance(event, SimulationStarted):
+            return
+
+        now = monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+        if self.tokens < 1:
+            self.dropped += 1
+            return
+        self.tokens -= 1
+        self.stream.write(format_event(event) + "\n")
+
+    def flush(self):
+        self.stream.flush()
@@ -0,0 +1,61 @@
+from typing import Dict, List, NamedTuple, Tuple
+from .events import *
+from .sinks import EventSink
+
+
+# Cambios de uno o varios turnos seguidos (first a turn; son varios si el reloj salto turnos sin
+# eventos o adelantados): movimientos (unidad, fila, columna), ataques (unidad, objetivo, danio
+# total), unidades muertas y unidades vivas de cada bando al terminar.
+class TurnDelta(NamedTuple):
+    first: int
+    turn: int
+    time: float
+    moves: List[Tuple[int, int, int]]
+    attacks: List[Tuple[int, int, float]]
+    deaths: List[int]
+    alive: Dict[int, int]
+
+
+# Sumidero que reenvia los eventos a otro y acumula los cambios del turno en curso. Los golpes
+# solo traen el id del objeto alcanzado, que puede repetirse entre unidades y otros objetos, asi
+# que una muerte se cuenta si la unidad con ese id esta muerta y no se habia contado antes.
+class TurnRecorder(EventSink):
+
+    def __init__(self, sink: EventSink, units: List):
+        self.sink = sink
+        self.units = {unit.id: unit for unit in units}
+        self.dead = {unit.id for unit in units if unit.life_points <= 0}
+        self.moves = []
+        self.attacks = []
+        self.deaths = []
+
+    @property
+    def wants_snapshots(self) -> bool:
+        return self.sink.wants_snapshots
+
+    def emit(self, event):
+        if isinstance(event, UnitMoved):
+            self.moves.append((event.unit, event.row, event.col))
+        elif isinstance(event, UnitAttacked):
+            damage = 0.0
+            for id, lost, life_points in event.hits:
+                damage += lost
+                if life_points <= 0 and id not in self.dead and id in self.units \
+                        and self.units[id].life_points <= 0:
+                    self.dead.add(id)
+                    self.deaths.append(id)
+            self.attacks.append((event.unit, event.target, damage))
+        self.sink.emit(event)
+
+    # cambios acumulados desde la ultima llamada
+    def take(self, first: int, simulator) -> TurnDelta:
+        alive = {side.id: len(side.alive_units) for side in simulator.sides}
+        delta = TurnDelta(first, simulator.turn, simulator.time, self.moves, self.attacks,
+                          self.deaths, alive)
+        self.moves = []
+        self.attacks = []
+        self.deaths = []
+        return delta
+
+    def flush(self):
+        self.sink.flush()
@@ -0,0 +1,83 @@
+from typing import List
+from numpy import array, inf, isfinite, unique, where, clip, int64
+from ..maps.maps import EMPTY
+from ..maps.geometry import MAX_STEP, ring_offsets
+from ..maps.spatial import SpatialIndex
+
+
+# Turnos que se pueden adelantar sin que ninguna unidad pueda interactuar con un enemigo. En el
+# modelo en bloque cada unidad avanza a lo sumo una celda por turno, asi que la distancia entre
+# bandos baja como mucho 2 por turno; al volver al motor detallado tiene que seguir siendo mayor
+# que el mayor alcance mas el movimiento de un turno, para que todas las unidades sigan dormidas.
+# Con index se usan las distancias que ya calculo ese indice sobre las posiciones actuales.
+def free_turns(sides: List, index: SpatialIndex = None) -> int:
+    if index is None:
+        SpatialIndex(sides).update_enemy_distances()
+    units = [unit for side in sides for unit in side.alive_units if unit.cell is not None]
+    if not units:
+        return 0
+
+    distance = min(unit.enemy_distance for unit in units)
+    if distance == inf:
+        return 0
+    reach = max(max(unit.vision, unit.max_range) for unit in units)
+    return max(int(distance - reach - 2 * MAX_STEP - 1) // 2, 0)
+
+
+# Un turno del modelo en bloque: cada unidad movil elige a la vez la celda vecina libre mas
+# transitable, penalizando la celda de la que viene para no oscilar. Las unidades que eligen la
+# misma celda se resuelven en orden y las demas esperan. No tiene en cuenta a los amigos ni las
+# celdas visitadas antes, por lo que es una aproximacion del movimiento detallado.
+def bulk_step(land, units: List, previous: dict):
+    movers = [unit for unit in units if unit.movil and unit.cell is not None]
+    if not movers:
+        return
+    passable, height, types = land.terrain()
+
+    rows = array([unit.cell.row for unit in movers], dtype=int64)
+    cols = array([unit.cell.col for unit in movers], dtype=int64)
+    offsets_rows, offsets_cols = ring_offsets(1, 1)
+    target_rows = rows[:, None] + offsets_rows
+    target_cols = cols[:, None] + offsets_cols
+    inside = (target_rows >= 0) & (target_rows < land.no_rows) & \
+             (target_cols >= 0) & (target_cols < land.no_columns)
+    target_rows = clip(target_rows, 0, land.no_rows - 1)
+    target_cols = clip(target_cols, 0, land.no_columns - 1)
+
+    p = passable[target_rows, target_cols]
+    cell_types = array([getattr(unit, "cell_type", "earth") for unit in movers])
+    free = inside & (p != 0) & (types[target_rows, target_cols] == cell_types[:, None]) \
+        & (land.side_grid[target_rows, target_cols] == EMPTY)
+    earth = cell_types == "earth"
+    climb = height[target_rows[earth], target_cols[earth]] - \
+        height[rows[earth], cols[earth]][:, None]
+    free[earth] &= abs(climb) <= 0.3
+
+    cost = where(free, 10 - p / 2, inf)
+    back = array([previous.get(id(unit), (-1, -1)) for unit in movers], dtype=int64).reshape(-1, 2)
+    returning = (target_rows == back[:, :1]) & (target_cols == back[:, 1:])
+    cost[returning] += p[returning] / 3
+
+    choice = cost.argmin(axis=1)
+    k = range(len(movers))
+    moving = isfinite(cost[k, choice]).nonzero()[0]
+    chosen = choice[moving]
+    targets = target_rows[moving, chosen] * land.no_columns + target_cols[moving, chosen]
+    _, first = unique(targets, return_index=True)
+
+    for m in sorted(moving[first].tolist()):
+        unit = movers[m]
+        cell = land[int(target_rows[m, choice[m]])][int(target_cols[m, choice[m]])]
+        previous[id(unit)] = (unit.cell.row, unit.cell.col)
+        unit.move_to_cell(cell)
+        unit.visited_cells.add(cell)
+
+
+# Adelantar turns turnos con el modelo en bloque. Los contadores de recarga bajan como en los
+# turnos en que la unidad no ataca.
+def warp(land, units: List, turns: int):
+    previous = {}
+    for _ in range(turns):
+        bulk_step(land, units, previous)
+    for unit in units:
+        unit.turns_recharging = max(unit.turns_recharging - turns, 0)
@@ -0,0 +1,3 @@
+from .jobs import *
+from .pool import *
+from .server import *
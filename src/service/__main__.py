@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+from urllib.request import Request, urlopen
+from tabulate import tabulate
+from typer import Typer, Argument, Option
+from .pool import WorkerPool, DONE
+from .server import make_server, LOOPBACK
+
+app = Typer()
+
+
+@app.command()
+def serve(host: str = Option("127.0.0.1", help="Address to listen on"),
+          port: int = Option(8765, help="Port to listen on"),
+          workers: int = Option(0, help="Worker processes (0 uses every core)"),
+          timeout: float = Option(300, help="Default time limit of a job in seconds"),
+          directory: str = Option(None, help="Directory for the replay traces"),
+          root: str = Option(".", help="Only Battle Script files under this directory can be run "
+                                       "by path"),
+          keep: int = Option(1000, help="Finished jobs kept with their replay traces"),
+          ttl: float = Option(3600, help="Seconds a finished job is kept"),
+          allow_remote: bool = Option(False, help="Listen on an address reachable from other "
+                                                  "hosts"),
+          verbose: bool = Option(False, help="Log every request")):
+    # el servicio ejecuta los escenarios que recibe, sin autenticacion
+    if host not in LOOPBACK and not allow_remote:
+        print(f"Refusing to listen on {host}: any host that reaches it can run code here. "
+              f"Use --allow-remote to do it anyway")
+        raise SystemExit(1)
+    pool = WorkerPool(workers or None, timeout, directory, root, keep, ttl)
+    server = make_server(pool, host, port, verbose)
+    print(f"Serving on http://{host}:{server.server_port} with {len(pool.threads)} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+@app.command()
+def submit(scenario: str = Argument(..., help="Battle Script file"),
+           url: str = Option("http://127.0.0.1:8765", help="Service address"),
+           replay: str = Option(None, help="Save the replay trace of the first simulation in this "
+                                           "file"),
+           output: bool = Option(False, help="Print the simulation events"),
+           timeout: float = Option(None, help="Time limit of the job in seconds")):
+    body = {"path": str(Path(scenario).resolve()), "replay": replay is not None, "output": output,
+            "wait": True}
+    if timeout is not None:
+        body["timeout"] = timeout
+    request = Request(f"{url}/jobs", json.dumps(body).encode(),
+                      {"Content-Type": "application/json"})
+    with urlopen(request) as response:
+        state = json.load(response)
+
+    if state["status"] != DONE:
+        print(f"Job {state['id']} {state['status']}: {state['error']}")
+        raise SystemExit(1)
+    result = state["result"]
+    if output:
+        print(result["output"], end="")
+    for simulation in result["simulations"]:
+        print(f"Turns: {simulation['turn']}")
+        print(tabulate([[f"Side {side['id']}", side["alive"], side["own_defeated"],
+                         side["enemy_defeated"]] for side in simulation["sides"]],
+                       headers=["Sides", "Alive", "Allies Dead", "Enemies Killed"]))
+    if replay is not None and result["replays"]:
+        with urlopen(f"{url}/jobs/{state['id']}/replay/0") as response:
+            Path(replay).write_bytes(response.read())
+
+
+if __name__ == "__main__":
+    app()
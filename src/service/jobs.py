@@ -0,0 +1,83 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from os.path import join
+from pathlib import Path
+from typing import NamedTuple, Optional
+from ..core.simulator import Simulator, NullSink, TextSink, TeeSink, ReplayWriter
+
+
+# Pedido de simulacion: codigo BattleScript o la ruta de un archivo .bs. Con replay se guarda la
+# traza de cada simulacion del escenario y con output el texto que habria mostrado por consola;
+# sin output no se formatea ningun evento.
+class Job(NamedTuple):
+    id: int
+    source: str = ""
+    path: str = ""
+    replay: bool = False
+    output: bool = False
+    timeout: Optional[float] = None
+
+
+# resumen de una simulacion terminada
+def summary(simulator: Simulator) -> dict:
+    return {
+        "turn": simulator.turn,
+        "sides": [{"id": side.id, "alive": len(side.alive_units),
+                   "own_defeated": side.no_own_units_defeated,
+                   "enemy_defeated": side.no_enemy_units_defeated} for side in simulator.sides]
+    }
+
+
+# Ruta de un escenario dentro de root. Solo se aceptan archivos BattleScript, que pasan por el
+# compilador; un .py se ejecutaria tal cual.
+def scenario_path(path: str, root: str) -> Path:
+    root = Path(root).resolve()
+    path = (root / path).resolve()
+    if path.suffix != ".bs":
+        raise ValueError(f"File {path} must be Battle Script type")
+    try:
+        path.relative_to(root)
+    except ValueError:
+        raise ValueError(f"File {path} is outside {root}")
+    return path
+
+
+# codigo Python del escenario del pedido
+def job_code(compiler, job: Job) -> str:
+    if not job.path:
+        return compiler(job.source)
+    return compiler(Path(job.path).read_text())
+
+
+# Compilar y ejecutar el escenario de un pedido. Las simulaciones que crea el escenario reciben el
+# sumidero del pedido, y al terminar se resumen todas las que quedaron en sus variables globales.
+def run_job(compiler, job: Job, directory: str) -> dict:
+    code = compile(job_code(compiler, job), f"<job {job.id}>", "exec")
+    stream = StringIO()
+    replays = []
+
+    def sink():
+        text = TextSink(stream) if job.output else NullSink()
+        if not job.replay:
+            return text
+        replays.append(join(directory, f"{job.id}-{len(replays)}.bsrp"))
+        return TeeSink(text, ReplayWriter(replays[-1]))
+
+    # el codigo generado importa el motor con "from .core import *"
+    scope = {"__name__": "src.__job__", "__package__": "src"}
+    sink_factory = Simulator.sink_factory
+    Simulator.sink_factory = staticmethod(sink)
+    try:
+        with redirect_stdout(stream):
+            exec(code, scope)
+    finally:
+        Simulator.sink_factory = sink_factory
+        for value in scope.values():
+            if isinstance(value, Simulator):
+                value.sink.close()
+
+    return {
+        "simulations": [summary(value) for value in scope.values() if isinstance(value, Simulator)],
+        "replays": replays,
+        "output": stream.getvalue() if job.output else None
+    }
@@ -0,0 +1,166 @@
+from glob import glob
+from itertools import count
+from multiprocessing import Pipe, Process
+from os import cpu_count, remove
+from os.path import join
+from queue import Queue
+from tempfile import mkdtemp
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Optional
+from ..language.compiler import Compiler
+from .jobs import Job, run_job, scenario_path
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+
+# Proceso de trabajo. Compila las tablas del parser una vez al arrancar y despues ejecuta los
+# pedidos que recibe hasta recibir None.
+def worker(conn, directory: str):
+    compiler = Compiler()
+    job = conn.recv()
+    while job is not None:
+        try:
+            conn.send((DONE, run_job(compiler, job, directory)))
+        except Exception as error:
+            conn.send((FAILED, str(error)))
+        job = conn.recv()
+    conn.close()
+
+
+# Estado de un pedido. done se activa cuando termina, bien o mal.
+class JobState:
+
+    def __init__(self, job: Job):
+        self.job = job
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.done = Event()
+        self.finished = None
+
+    def finish(self, status: str, value):
+        self.finished = monotonic()
+        self.status = status
+        if status == DONE:
+            self.result = value
+        else:
+            self.error = value
+        self.done.set()
+
+    def as_dict(self) -> dict:
+        return {"id": self.job.id, "status": self.status, "result": self.result,
+                "error": self.error}
+
+
+# Pool de procesos de trabajo con el motor ya importado y el compilador listo. Cada proceso lo
+# atiende un hilo que toma pedidos de la cola; si un pedido pasa de su tiempo limite el proceso se
+# termina y se arranca otro en su lugar. Las trazas se guardan en directory y los escenarios por
+# ruta tienen que estar dentro de root. De los pedidos terminados se guardan los ultimos keep, y
+# ninguno por mas de ttl segundos; al olvidarlos se borran sus trazas.
+class WorkerPool:
+
+    def __init__(self, workers: int = None, timeout: float = 300, directory: str = None,
+                 root: str = ".", keep: int = 1000, ttl: float = 3600):
+        self.timeout = timeout
+        self.directory = directory or mkdtemp(prefix="battle-sim-")
+        self.root = root
+        self.keep = keep
+        self.ttl = ttl
+        self.queue = Queue()
+        self.jobs = {}
+        self.ids = count(1)
+        self.lock = Lock()
+        self.threads = [Thread(target=self.serve, daemon=True)
+                        for _ in range(workers or cpu_count() or 1)]
+        for thread in self.threads:
+            thread.start()
+
+    # arrancar un proceso de trabajo
+    def spawn(self):
+        conn, child = Pipe()
+        process = Process(target=worker, args=(child, self.directory), daemon=True)
+        process.start()
+        child.close()
+        return process, conn
+
+    # bucle del hilo que atiende un proceso
+    def serve(self):
+        process, conn = self.spawn()
+        job = self.queue.get()
+        while job is not None:
+            state = self.jobs[job.id]
+            state.status = RUNNING
+            timeout = job.timeout if job.timeout is not None else self.timeout
+            try:
+                conn.send(job)
+                if not conn.poll(timeout):
+                    raise TimeoutError()
+                status, value = conn.recv()
+            # el proceso pudo morir mientras esperaba (OSError al enviar) o con el pedido (EOFError)
+            except (TimeoutError, EOFError, OSError) as error:
+                process.terminate()
+                process.join()
+                conn.close()
+                process, conn = self.spawn()
+                status = TIMEOUT if isinstance(error, TimeoutError) else FAILED
+                value = f"Job exceeded {timeout} seconds" if status == TIMEOUT \
+                    else "Worker process died"
+            state.finish(status, value)
+            job = self.queue.get()
+
+        try:
+            conn.send(None)
+        except OSError:
+            process.terminate()
+        conn.close()
+        process.join()
+
+    # encolar un pedido; los argumentos son los campos de Job salvo el id
+    def submit(self, **fields) -> JobState:
+        if fields.get("path"):
+            fields["path"] = str(scenario_path(fields["path"], self.root))
+        with self.lock:
+            self.evict()
+            job = Job(next(self.ids), **fields)
+            state = self.jobs[job.id] = JobState(job)
+        self.queue.put(job)
+        return state
+
+    def get(self, id: int) -> Optional[JobState]:
+        with self.lock:
+            self.evict()
+            return self.jobs.get(id)
+
+    # olvidar los pedidos terminados que sobran o que vencieron, con sus trazas
+    def evict(self):
+        now = monotonic()
+        finished = sorted((state for state in self.jobs.values() if state.finished is not None),
+                          key=lambda state: state.finished)
+        excess = len(finished) - self.keep
+        for k, state in enumerate(finished):
+            if k < excess or now - state.finished > self.ttl:
+                del self.jobs[state.job.id]
+                # tambien las trazas a medio escribir de los pedidos que vencieron su tiempo
+                for path in glob(join(self.directory, f"{state.job.id}-*.bsrp")):
+                    try:
+                        remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    # esperar a que termine un pedido
+    def wait(self, id: int, timeout: float = None) -> JobState:
+        state = self.jobs[id]
+        state.done.wait(timeout)
+        return state
+
+    # terminar los procesos cuando acaben los pedidos en cola
+    def close(self):
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
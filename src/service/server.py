@@ -0,0 +1,90 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .pool import WorkerPool, DONE
+
+# campos de un pedido que se aceptan por HTTP
+FIELDS = {"source": str, "path": str, "replay": bool, "output": bool, "timeout": (int, float)}
+
+
+# API HTTP del servicio:
+#   POST /jobs                  encolar un pedido (JSON con los campos de FIELDS y "wait")
+#   GET  /jobs/<id>             estado y resultado del pedido
+#   GET  /jobs/<id>/replay/<k>  traza de la k-esima simulacion del pedido
+class JobHandler(BaseHTTPRequestHandler):
+
+    def send_json(self, code: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self.send_json(404, {"error": f"Unknown path {self.path}"})
+        # un formulario de otra pagina puede enviar text/plain sin consulta previa del navegador,
+        # pero no application/json
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            return self.send_json(415, {"error": "Jobs must be sent as application/json"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("A job must be a JSON object")
+            fields = {key: value for key, value in body.items() if key in FIELDS}
+            if any(not isinstance(value, FIELDS[key]) for key, value in fields.items()):
+                raise ValueError("Invalid field type")
+            if not fields.get("source") and not fields.get("path"):
+                raise ValueError("A job needs a source or a path")
+            state = self.server.pool.submit(**fields)
+        except ValueError as error:
+            return self.send_json(400, {"error": str(error)})
+
+        if body.get("wait"):
+            state.done.wait()
+            return self.send_json(200, state.as_dict())
+        self.send_json(202, state.as_dict())
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != "jobs" or not parts[1].isdigit():
+            return self.send_json(404, {"error": f"Unknown path {self.path}"})
+        state = self.server.pool.get(int(parts[1]))
+        if state is None:
+            return self.send_json(404, {"error": f"Unknown job {parts[1]}"})
+        if len(parts) == 2:
+            return self.send_json(200, state.as_dict())
+
+        if parts[2] != "replay" or len(parts) > 4 or (len(parts) == 4 and not parts[3].isdigit()):
+            return self.send_json(404, {"error": f"Unknown path {self.path}"})
+        k = int(parts[3]) if len(parts) == 4 else 0
+        if state.status != DONE or k >= len(state.result["replays"]):
+            return self.send_json(404, {"error": f"Job {parts[1]} has no replay {k}"})
+        try:
+            with open(state.result["replays"][k], "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return self.send_json(404, {"error": f"Job {parts[1]} has no replay {k}"})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+# direcciones que solo aceptan conexiones de la misma maquina
+LOOPBACK = ("127.0.0.1", "localhost", "::1")
+
+
+# servidor HTTP del pool, solo en localhost por defecto; con port 0 se elige un puerto libre
+def make_server(pool: WorkerPool, host: str = "127.0.0.1", port: int = 0,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), JobHandler)
+    server.pool = pool
+    server.verbose = verbose
+    return server
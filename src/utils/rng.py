@@ -0,0 +1,120 @@
+import random
+from os import urandom
+from typing import NamedTuple
+from numpy import asarray, uint64, float64
+from numpy.random import default_rng
+
+MASK = (1 << 64) - 1
+MASK53 = (1 << 53) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+
+# propositos de los flujos aleatorios
+TIMING = 1
+ESTIMATE = 2
+ATTACK = 3
+MAP = 4
+
+
+# funcion de mezcla de SplitMix64
+def mix64(z: int) -> int:
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+# semilla de 64 bits derivada de forma determinista de una semilla y una lista de claves
+def derive(seed: int, *keys: int) -> int:
+    h = mix64((seed + GOLDEN) & MASK)
+    for key in keys:
+        h = mix64(((h ^ (key & MASK)) + GOLDEN) & MASK)
+    return h
+
+
+# Generador SplitMix64 con la interfaz de random.Random. Su estado es un solo entero, por lo
+# que se pueden tener millones de flujos independientes. Con antithetic se invierten los bits de
+# cada numero, asi que random devuelve (2^53 - 1 - B) / 2^53, que sigue en [0, 1), y los enteros
+# de getrandbits, randint y choice tambien quedan reflejados.
+class SplitMix(random.Random):
+
+    def __init__(self, state: int = 0, antithetic: bool = False):
+        self.antithetic = antithetic
+        random.Random.__init__(self, state)
+
+    def seed(self, a=None, version=2):
+        self.state = (a if a is not None else int.from_bytes(urandom(8), "little")) & MASK
+
+    def next(self) -> int:
+        self.state = (self.state + GOLDEN) & MASK
+        return mix64(self.state)
+
+    def random(self) -> float:
+        bits = self.next() >> 11
+        if self.antithetic:
+            bits = MASK53 - bits
+        return bits * (1.0 / (1 << 53))
+
+    # k bits sin reflejar
+    def bits(self, k: int) -> int:
+        bits = 0
+        n = 0
+        while n < k:
+            bits |= self.next() << n
+            n += 64
+        return bits & ((1 << k) - 1)
+
+    def getrandbits(self, k: int) -> int:
+        bits = self.bits(k)
+        return ((1 << k) - 1) ^ bits if self.antithetic else bits
+
+    # entero en [0, n) por rechazo, como random.Random; con antithetic se refleja el resultado y
+    # no los bits, para que el rechazo no rompa la pareja
+    def _randbelow(self, n: int) -> int:
+        k = n.bit_length()
+        r = self.bits(k)
+        while r >= n:
+            r = self.bits(k)
+        return n - 1 - r if self.antithetic else r
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
+
+    def __reduce__(self):
+        return SplitMix, (self.state, self.antithetic)
+
+
+# flujos de una unidad: estimacion del enemigo y resolucion del ataque
+class UnitStreams(NamedTuple):
+    estimate: random.Random
+    attack: random.Random
+
+
+# Contexto de numeros aleatorios divisible por unidad y proposito. Los flujos solo dependen de
+# la semilla, el id de la unidad y el proposito, asi que dos variantes de un escenario con la
+# misma semilla reciben los mismos numeros para las mismas unidades (numeros aleatorios comunes).
+class RandomStreams:
+
+    def __init__(self, seed: int = None, antithetic: bool = False):
+        self.seed = seed if seed is not None else int.from_bytes(urandom(8), "little")
+        self.antithetic = antithetic
+
+    def unit(self, unit_id: int) -> UnitStreams:
+        return UnitStreams(SplitMix(derive(self.seed, ESTIMATE, unit_id), self.antithetic),
+                           SplitMix(derive(self.seed, ATTACK, unit_id), self.antithetic))
+
+    # un uniforme por cada id para la clave dada, en una sola operacion vectorizada
+    def uniforms(self, purpose: int, key: int, ids):
+        z = asarray(ids).astype(uint64) * uint64(GOLDEN) + uint64(derive(self.seed, purpose, key))
+        z = (z ^ (z >> uint64(30))) * uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> uint64(27))) * uint64(0x94D049BB133111EB)
+        z = z ^ (z >> uint64(31))
+        z = z >> uint64(11)
+        if self.antithetic:
+            z = uint64(MASK53) - z
+        return z.astype(float64) * (1.0 / (1 << 53))
+
+    # generador de NumPy para un subsistema
+    def numpy(self, purpose: int):
+        return default_rng(derive(self.seed, purpose))
@@ -4,3 +4,26 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import src
+
+
+import pytest
+from numpy import full
+from src.core import LandMap, LandUnit, Side, Simulator, NullSink
+
+
+@pytest.fixture
+def battle():
+    # mapa plano de tierra con dos bandos enfrentados en filas opuestas
+    def build(n=8, units_per_side=3, turns=30, **kwargs):
+        land_map = LandMap(n, n, full((n, n), 10.0), full((n, n), 0.5), 0.45)
+        sides = [Side(1, []), Side(2, [])]
+        for k in range(units_per_side):
+            for side, row in ((sides[0], 0), (sides[1], n - 1)):
+                unit = LandUnit(side.id * 100 + k, life_points=10, defense=5, attack=4, moral=5,
+                                ofensive=5, min_range=1, max_range=2, radio=1, vision=4,
+                                intelligence=5, recharge_turns=0, solidarity=True, movil=True)
+                side.add_unit(unit)
+                unit.put_in_cell(land_map, row, k)
+        kwargs.setdefault('sink', NullSink())
+        return Simulator(land_map, sides, turns, 1, **kwargs)
+    return build
@@ -0,0 +1,24 @@
+from src.core import SpatialIndex
+
+
+def test_far_units_are_dormant_and_decide_the_same(battle):
+    simulator = battle(n=16, units_per_side=4)
+    SpatialIndex(simulator.sides).update_enemy_distances()
+    simulator.activity.update(simulator.sides)
+
+    assert simulator.activity.no_dormant == 8
+    for unit in simulator.units:
+        state = unit.streams.estimate.getstate()
+        dormant = unit.decide()
+        unit.dormant = False
+        assert unit.decide() == dormant
+        assert unit.streams.estimate.getstate() == state
+
+
+def test_units_wake_up_when_enemies_approach(battle):
+    simulator = battle(n=16, units_per_side=4, seed=1, turns=8)
+    simulator.start()
+
+    assert simulator.activity.no_awake > 0
+    for unit in simulator.alive_units():
+        assert unit.dormant == (unit.enemy_distance > simulator.activity.wake_radius(unit, 2))
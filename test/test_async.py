@@ -0,0 +1,54 @@
+import asyncio
+from src.core.simulator.events import *
+from src.core.simulator.sinks import MemorySink
+
+
+def actions(sink):
+    return [e for e in sink.events if isinstance(e, (UnitMoved, UnitAttacked, UnitHeld))]
+
+
+def test_concurrent_simulations_match_sequential_runs(battle):
+    simulators = [battle(seed=seed, sink=MemorySink()) for seed in (1, 2, 3)]
+
+    async def main():
+        await asyncio.gather(*(simulator.run_async() for simulator in simulators))
+    asyncio.run(main())
+
+    for seed, simulator in zip((1, 2, 3), simulators):
+        reference = battle(seed=seed, sink=MemorySink())
+        reference.start()
+        assert actions(simulator.sink) == actions(reference.sink)
+        assert simulator.turn == reference.turn
+
+
+def test_async_deltas_with_a_slow_consumer(battle):
+    simulator = battle(seed=6)
+
+    async def main():
+        deltas = []
+        async for delta in simulator.aiter_turns(maxsize=2):
+            # la simulacion no se adelanta mas que lo que cabe en la cola
+            assert simulator.turn - delta.turn <= 3
+            deltas.append(delta)
+            await asyncio.sleep(0.001)
+        return deltas
+    deltas = asyncio.run(main())
+
+    assert [d.turn for d in deltas] == [d.turn for d in battle(seed=6).iter_turns()]
+
+
+def test_breaking_out_stops_the_simulation(battle):
+    sink = MemorySink()
+    simulator = battle(seed=6, sink=sink)
+
+    async def main():
+        turns = simulator.aiter_turns()
+        async for delta in turns:
+            if delta.turn == 3:
+                break
+        await turns.aclose()
+        assert simulator.sink is sink
+        assert all(task is asyncio.current_task() for task in asyncio.all_tasks())
+    asyncio.run(main())
+
+    assert simulator.turn <= 5
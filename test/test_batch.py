@@ -0,0 +1,75 @@
+from numpy import full
+from src.core import LandMap, LandUnit, Side, Simulator
+from src.core.simulator.batch import *
+
+
+def scenario(seed):
+    n = 6
+    land_map = LandMap(n, n, full((n, n), 10.0), full((n, n), 0.5), 0.45)
+    sides = [Side(1, []), Side(2, [])]
+    for k in range(2):
+        for side, row in ((sides[0], 0), (sides[1], n - 1)):
+            attack = 4 if side.id == 1 else 2
+            unit = LandUnit(side.id * 10 + k, 10, 5, attack, 5, 5, 1, 2, 1, 4, 5, 0, True, True)
+            side.add_unit(unit)
+            unit.put_in_cell(land_map, row, k)
+    return Simulator(land_map, sides, 40, 1, seed=seed)
+
+
+def test_spawn_seeds_are_independent_and_reproducible():
+    seeds = spawn_seeds(3, 10)
+
+    assert len(set(seeds)) == 10
+    assert seeds == spawn_seeds(3, 10)
+
+
+def test_replica_is_reproducible():
+    a = run_replica(scenario, 42)
+    b = run_replica(scenario, 42)
+
+    assert a == b
+
+
+def test_batch_on_process_pool():
+    result = run_batch(scenario, 8, workers=2, seed=1)
+
+    assert len(result) == 8
+    assert result.side_ids == [1, 2]
+    assert abs(result.win_rate(1) + result.win_rate(2) + result.draw_rate() - 1) < 1e-9
+    assert [r.seed for r in result] == spawn_seeds(1, 8)
+
+
+def test_confidence_interval_binary_never_collapses():
+    interval = confidence_interval([1.0] * 20)
+
+    assert interval.width > 0
+    assert interval.high <= 1 + 1e-12
+
+
+def test_adaptive_stops_before_max():
+    result = run_adaptive(scenario, win(1), width=0.5, wave=8, max_replicas=200, workers=2, seed=5)
+
+    assert len(result) < 200 and len(result) % 8 == 0
+    assert result.interval.width < 0.5
+    assert [r.seed for r in result] == spawn_seeds(5, len(result))
+
+
+def stronger(seed):
+    simulator = scenario(seed)
+    for unit in simulator.sides[1]:
+        unit.attack += 1
+    return simulator
+
+
+def test_common_random_numbers_cancel_for_identical_variants():
+    result = run_paired(scenario, scenario, casualties(1), 6, workers=1, seed=2)
+
+    assert result.differences == [0.0] * 6
+    assert not result.significant
+
+
+def test_antithetic_pairs_run_two_replicas_per_seed():
+    result = run_paired(scenario, stronger, win(2), 4, antithetic=True, workers=2, seed=2)
+
+    assert len(result.a) == len(result.b) == 8
+    assert len(result.differences) == 4
@@ -0,0 +1,50 @@
+from io import BytesIO
+import pytest
+from src.core.simulator.sinks import MemorySink
+from src.core.simulator.events import UnitMoved, UnitAttacked, UnitHeld
+
+
+def actions(sink):
+    return [e for e in sink.events if isinstance(e, (UnitMoved, UnitAttacked, UnitHeld))]
+
+
+def test_restore_continues_identically(battle):
+    original = battle(seed=8, turns=4)
+    original.start()
+    blob = BytesIO()
+    original.save_checkpoint(blob)
+
+    original.sink = MemorySink()
+    original.turns = 30
+    original.start()
+
+    restored = battle(seed=8, turns=30, sink=MemorySink())
+    blob.seek(0)
+    restored.load_checkpoint(blob)
+
+    assert restored.turn == 4
+    restored.start()
+
+    assert actions(restored.sink) == actions(original.sink)
+    assert [u.life_points for u in restored.units] == [u.life_points for u in original.units]
+    assert [u.cell for u in restored.units] == [u.cell for u in original.units]
+
+
+def test_periodic_checkpoint_file(battle, tmp_path):
+    path = tmp_path / "battle.bsck"
+    simulator = battle(seed=3, turns=6)
+    simulator.start(checkpoint=path, every=2)
+
+    restored = battle(seed=3, turns=6)
+    restored.load_checkpoint(path)
+
+    assert restored.turn == simulator.turn - simulator.turn % 2
+
+
+def test_checkpoint_of_another_scenario_is_rejected(battle):
+    blob = BytesIO()
+    battle(units_per_side=2).save_checkpoint(blob)
+    blob.seek(0)
+
+    with pytest.raises(Exception):
+        battle(units_per_side=3).load_checkpoint(blob)
@@ -0,0 +1,31 @@
+from src.core import MemorySink, TurnStarted, UnitHeld
+
+
+def artillery(battle, **kwargs):
+    simulator = battle(n=3, units_per_side=3, turns=40, sink=MemorySink(), **kwargs)
+    for unit in simulator.units:
+        unit.movil = False
+        unit.recharge_turns = 6
+    return simulator
+
+
+def test_waiting_units_are_not_woken(battle):
+    simulator = artillery(battle, seed=9)
+    simulator.start()
+    driven = artillery(battle, seed=9, event_driven=True)
+    driven.start()
+
+    actions = [event for event in simulator.sink.events
+               if hasattr(event, 'time') and not isinstance(event, UnitHeld)]
+    assert [event for event in driven.sink.events if hasattr(event, 'time')] == actions
+    assert [unit.life_points for unit in driven.units] == \
+        [unit.life_points for unit in simulator.units]
+
+
+def test_clock_jumps_over_idle_turns(battle):
+    simulator = artillery(battle, seed=9, event_driven=True)
+    simulator.start()
+
+    started = [event.turn for event in simulator.sink.of_type(TurnStarted)]
+    assert started[:2] == [1, 8]
+    assert simulator.turn == 40 or simulator.no_enemies
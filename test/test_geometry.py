@@ -0,0 +1,28 @@
+from src.core.maps.geometry import ring_offsets, ring_cells
+
+
+def test_ring_offsets_cover_the_chebyshev_band():
+    rows, cols = ring_offsets(2, 3)
+    cells = list(zip(rows.tolist(), cols.tolist()))
+
+    expected = {(i, j) for i in range(-3, 4) for j in range(-3, 4) if 2 <= max(abs(i), abs(j)) <= 3}
+    assert len(cells) == len(expected) and set(cells) == expected
+
+
+def test_ring_offsets_scan_order():
+    rows, cols = ring_offsets(0, 1)
+
+    assert list(zip(rows.tolist(), cols.tolist())) == [
+        (0, 0), (-1, -1), (-1, 0), (-1, 1), (1, -1), (1, 0), (1, 1), (0, -1), (0, 1)]
+
+
+def test_ring_offsets_are_cached():
+    assert ring_offsets(1, 4) is ring_offsets(1, 4)
+
+
+def test_ring_cells_are_clipped():
+    rows, cols = ring_cells(0, 0, 1, 2, 5, 5)
+
+    assert ((rows >= 0) & (cols >= 0)).all()
+    assert set(zip(rows.tolist(), cols.tolist())) == {
+        (i, j) for i in range(3) for j in range(3) if (i, j) != (0, 0)}
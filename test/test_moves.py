@@ -0,0 +1,39 @@
+def check_move_costs(simulator):
+    for unit in simulator.alive_units():
+        costs = unit.move_costs('earth')
+        for i in range(-1, 2):
+            for j in range(-1, 2):
+                row, col = unit.cell.row + i, unit.cell.col + j
+                if (i or j) and 0 <= row < unit.map.no_rows and 0 <= col < unit.map.no_columns:
+                    cost = unit.move_cost_calculate(unit.map[row][col], 'earth')
+                    assert costs[i + 1][j + 1] == cost
+
+
+def test_move_costs_match_move_cost_calculate(battle):
+    simulator = battle(n=9, units_per_side=6, seed=4, turns=3)
+    simulator.start()
+    check_move_costs(simulator)
+
+
+def test_move_costs_without_threat_map(battle):
+    simulator = battle(n=9, units_per_side=6, seed=5, turns=3)
+    simulator.start()
+    for side in simulator.sides:
+        side.threat_map = None
+    check_move_costs(simulator)
+
+
+def test_overridden_cost_methods_are_used(battle):
+    from src.core.objects.units import LandUnit
+    from src.core.simulator.resolver import MOVE_ACTION
+
+    # como las clases generadas desde BattleScript, redefine uno de los metodos del costo
+    class Straight(LandUnit):
+        def in_range_of_enemy(self, cell):
+            return 0 if cell.col == self.cell.col else 100
+
+    simulator = battle(n=9, units_per_side=3, seed=1)
+    for unit in simulator.units:
+        unit.__class__ = Straight
+        intent = unit.decide()
+        assert intent.action == MOVE_ACTION and intent.col == unit.cell.col
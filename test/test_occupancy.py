@@ -0,0 +1,87 @@
+from src.core import LandUnit
+from src.core.maps.maps import EMPTY
+from src.core.maps.threat import ThreatMap
+
+
+# rejillas reconstruidas desde las celdas
+def grids_from_cells(land_map):
+    occupancy = [[cell.bs_object.id if cell.bs_object is not None else EMPTY for cell in row]
+                 for row in land_map.matrix]
+    sides = [[cell.bs_object.grid_side() if cell.bs_object is not None else EMPTY for cell in row]
+             for row in land_map.matrix]
+    return occupancy, sides
+
+
+def test_grids_follow_placement_moves_and_deaths(battle):
+    simulator = battle(units_per_side=2)
+    land_map = simulator.earth_map
+    unit = simulator.sides[0].units[0]
+
+    assert land_map.occupancy[0, 0] == unit.id
+    assert land_map.side_grid[0, 0] == 1
+    assert land_map.side_grid[land_map.no_rows - 1, 1] == 2
+
+    unit.move_to_cell(land_map[1][0])
+
+    assert land_map.occupancy[0, 0] == EMPTY and land_map.side_grid[0, 0] == EMPTY
+    assert land_map.occupancy[1, 0] == unit.id and land_map[1][0].bs_object is unit
+
+    unit.take_damage(10_000)
+
+    assert land_map.side_grid[1, 0] == EMPTY and land_map[1][0].bs_object is None
+
+
+def test_grid_queries(battle):
+    simulator = battle(n=6, units_per_side=2)
+    land_map = simulator.earth_map
+    a, b = simulator.sides[0].units
+    enemy = simulator.sides[1].units[0]
+
+    assert a.nearby_friend(land_map[1][0])
+    assert not a.nearby_friend(land_map[2][2])
+
+    enemy.move_to_cell(land_map[2][0])
+
+    assert a.enemy_in_range(land_map[0][0]) == (True, land_map[2][0])
+    assert a.in_range_of_enemy(land_map[1][1]) == 1
+
+
+def test_maps_keep_their_own_size(battle):
+    small = battle(n=5).earth_map
+    big = battle(n=9).earth_map
+
+    assert (small.no_rows, big.no_rows) == (5, 9)
+
+
+# como lo hacia el codigo generado antes de las rejillas: asignando bs_object directamente
+class DirectUnit(LandUnit):
+
+    def move_to_cell(self, cell):
+        self.cell.bs_object = None
+        cell.bs_object = self
+        self.cell = cell
+
+    def take_damage(self, damage):
+        self.life_points -= damage / self.defense
+        if self.life_points <= 0:
+            self.life_points = 0
+            self.cell.bs_object = None
+
+
+def test_direct_cell_assignments_keep_the_grids(battle):
+    simulator = battle(seed=3)
+    for unit in simulator.units:
+        unit.__class__ = DirectUnit
+    simulator.start()
+    land_map = simulator.earth_map
+
+    occupancy, sides = grids_from_cells(land_map)
+    assert land_map.occupancy.tolist() == occupancy
+    assert land_map.side_grid.tolist() == sides
+    for side in simulator.sides:
+        threat = ThreatMap(land_map, side.id)
+        for row in land_map.matrix:
+            for cell in row:
+                if cell.bs_object is not None:
+                    threat.on_place(cell.bs_object, cell.row, cell.col)
+        assert (side.threat_map.grid == threat.grid).all()
@@ -0,0 +1,149 @@
+import pytest
+from numpy import isnan, full
+from src.core.maps import LandMap
+from src.core.objects.units import LandUnit
+from src.core.simulator.resolver import Intent, ATTACK_ACTION
+from src.core.maps.maps import NO_SIDE
+from src.core.maps.threat import ThreatMap
+from src.core.simulator.events import *
+from src.core.simulator.sinks import MemorySink, TeeSink
+from src.core.simulator.replay import *
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_trace_matches_events(battle, tmp_path, compress):
+    path = tmp_path / "battle.bsrp"
+    memory = MemorySink()
+    writer = ReplayWriter(path, chunk_size=16, compress=compress)
+    simulator = battle(seed=5, sink=TeeSink(memory, writer))
+    simulator.start()
+    writer.close()
+
+    trace = read_replay(path)
+
+    assert (trace["action"] == SPAWN).sum() == len(simulator.units)
+    moves = trace[trace["action"] == MOVE]
+    assert [(int(r["unit"]), int(r["row"]), int(r["col"])) for r in moves] == \
+        [(e.unit, e.row, e.col) for e in memory.of_type(UnitMoved)]
+    attacks = trace[trace["action"] == ATTACK]
+    assert [(int(r["unit"]), int(r["target"])) for r in attacks] == \
+        [(e.unit, e.target) for e in memory.of_type(UnitAttacked)]
+    assert (trace["action"] == HOLD).sum() == len(memory.of_type(UnitHeld))
+    assert not isnan(trace["time"][trace["action"] != SPAWN]).any()
+
+
+def test_attack_damage_is_the_life_points_lost(battle, tmp_path):
+    path = tmp_path / "battle.bsrp"
+    writer = ReplayWriter(path)
+    simulator = battle(seed=2, units_per_side=2, sink=writer)
+    simulator.start()
+    writer.close()
+
+    trace = read_replay(path)
+    attacks = trace[trace["action"] == ATTACK]
+    hits = trace[trace["action"] == HIT]
+    lost = sum(10 - unit.life_points for unit in simulator.units)
+    assert attacks["value"].sum() == pytest.approx(lost)
+    for unit in simulator.units:
+        left = hits["value"][hits["unit"] == unit.id]
+        assert (left[-1] if len(left) else 10) == unit.life_points
+
+
+# como las clases generadas desde BattleScript, donde attack_enemy y take_damage no devuelven nada
+class Script(LandUnit):
+
+    def attack_enemy(self, enemy):
+        enemy.take_damage(self.attack)
+
+
+class Stubborn(Script):
+
+    def take_damage(self, damage):
+        self.life_points -= 1
+
+
+def test_hits_do_not_depend_on_attack_enemy_returning_them(battle):
+    simulator = battle(units_per_side=1)
+    attacker, enemy = simulator.units
+    attacker.__class__ = Script
+    enemy.move_to_cell(simulator.earth_map[2][0])
+    intent = Intent(attacker.id, ATTACK_ACTION, 2, 0, enemy.id)
+
+    event = attacker.apply(intent)
+    assert event.hits == ((enemy.id, pytest.approx(10 - enemy.life_points), enemy.life_points),)
+
+    enemy.__class__ = Stubborn
+    event = attacker.apply(intent)
+    assert event.hits == ((enemy.id, 1, enemy.life_points),)
+
+
+def test_not_a_trace_is_rejected(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"nothing to see here")
+
+    with pytest.raises(Exception):
+        read_replay(path)
+
+
+def record(battle, tmp_path, **kwargs):
+    path = tmp_path / "battle.bsrp"
+    writer = ReplayWriter(path)
+    simulator = battle(sink=writer, **kwargs)
+    simulator.start()
+    writer.close()
+    return simulator, path
+
+
+def test_player_rebuilds_the_final_state(battle, tmp_path):
+    simulator, path = record(battle, tmp_path, seed=4, turns=20)
+    land = LandMap(8, 8, full((8, 8), 10.0), full((8, 8), 0.5), 0.45)
+
+    player = ReplayPlayer(path, land, keyframe_interval=3)
+    player.seek(simulator.turn)
+
+    for unit in simulator.units:
+        k = list(player.ids).index(unit.id)
+        assert player.life_points[k] == unit.life_points
+        if unit.life_points > 0:
+            assert (player.rows[k], player.cols[k]) == (unit.cell.row, unit.cell.col)
+    assert (land.occupancy == simulator.earth_map.occupancy).all()
+    assert (land.side_grid == simulator.earth_map.side_grid).all()
+
+
+def test_player_works_on_maps_with_threat_maps(battle, tmp_path):
+    simulator, path = record(battle, tmp_path, seed=4, turns=20)
+    land = LandMap(8, 8, full((8, 8), 10.0), full((8, 8), 0.5), 0.45)
+    threats = [ThreatMap(land, side.id) for side in simulator.sides]
+    land.observers.extend(threats)
+
+    player = ReplayPlayer(path, land, keyframe_interval=3)
+    for _ in player.frames():
+        assert all(not threat.grid.any() for threat in threats)
+    assert (land.occupancy == simulator.earth_map.occupancy).all()
+
+
+def test_seek_matches_playing_forward(battle, tmp_path):
+    simulator, path = record(battle, tmp_path, seed=9, turns=20)
+    forward = ReplayPlayer(path, keyframe_interval=4)
+    states = {turn: (forward.rows.copy(), forward.life_points.copy()) for turn in forward.frames()}
+
+    assert len(states) > 8
+    player = ReplayPlayer(path, keyframe_interval=4)
+    for turn in (7, 3, 6, 6, 0, max(states), 5):
+        player.seek(turn)
+        rows, life_points = states[turn]
+        assert (player.rows == rows).all()
+        assert (player.life_points == life_points).all()
+
+
+def test_units_without_side_get_a_sentinel(battle, tmp_path):
+    path = tmp_path / "battle.bsrp"
+    simulator = battle()
+    unit = simulator.units[0]
+    unit.side = None
+    writer = ReplayWriter(path)
+    writer.emit(SimulationStarted(0, snapshot([unit])))
+    writer.close()
+
+    spawn, = read_replay(path)
+    assert spawn["unit"] == unit.id and spawn["target"] == NO_SIDE
@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+from src.core import MemorySink, Simulator, UnitMoved, UnitHeld, Intent, MOVE_ACTION, UnitStore
+from src.core.simulator.replica import Replica, VisitedLog, strip_units, terrain_rows
+
+
+def actions(simulator):
+    simulator.start()
+    return [event for event in simulator.sink.events if hasattr(event, 'time')]
+
+
+def test_simultaneous_turns_do_not_depend_on_the_executor(battle):
+    expected = actions(battle(units_per_side=4, seed=8, sink=MemorySink(), simultaneous=True))
+
+    with ThreadPoolExecutor(3) as executor:
+        assert actions(battle(units_per_side=4, seed=8, sink=MemorySink(), simultaneous=True,
+                              executor=executor)) == expected
+    with ProcessPoolExecutor(2) as executor:
+        assert actions(battle(units_per_side=4, seed=8, sink=MemorySink(), simultaneous=True,
+                              executor=executor)) == expected
+
+
+def test_process_pool_leaves_the_store_alone(battle):
+    expected = battle(units_per_side=4, seed=8, sink=MemorySink(), simultaneous=True)
+    expected_actions = actions(expected)
+
+    store = UnitStore()
+    with ProcessPoolExecutor(2) as executor:
+        simulator = battle(units_per_side=4, seed=8, sink=MemorySink(), simultaneous=True,
+                           executor=executor, store=store)
+        assert actions(simulator) == expected_actions
+
+    assert store["life_points"].tolist() == [unit.life_points for unit in expected.units]
+    assert store["side"].tolist() == [unit.side.id for unit in expected.units]
+    assert store["row"].tolist() == [unit.cell.row if unit.cell is not None else -1
+                                     for unit in simulator.units]
+
+
+def test_replicas_catch_up_on_the_last_visited_cells(battle):
+    simulator = battle()
+    land = simulator.earth_map
+    replica = Replica(strip_units(simulator.units), [unit.side.id for unit in simulator.units], 0,
+                      terrain_rows(land, 0, land.no_rows))
+    log = VisitedLog(window=2)
+    unit = simulator.units[0]
+    unit.visited_cells = {land[0][j] for j in range(4)}
+
+    assert not replica.catch_up({0: log.tail(0, unit)})
+    assert replica.catch_up({0: log.tail(0, unit, full=True)})
+    unit.visited_cells.add(land[1][0])
+    epoch, size, cells = log.tail(0, unit)
+    assert (size, len(cells)) == (5, 2)
+    assert replica.catch_up({0: (epoch, size, cells)})
+    assert replica.units[0].visited_cells == unit.visited_cells
+
+    # un conjunto nuevo, como al restaurar un checkpoint, empieza otra epoca
+    unit.visited_cells = {land[2][2]}
+    assert replica.catch_up({0: log.tail(0, unit)})
+    assert replica.units[0].visited_cells == unit.visited_cells
+
+
+def test_decide_does_not_change_the_map(battle):
+    simulator = battle(units_per_side=4)
+    grid = simulator.earth_map.side_grid.copy()
+
+    intents = [unit.decide() for unit in simulator.units]
+
+    assert all(intent.action == MOVE_ACTION for intent in intents)
+    assert (simulator.earth_map.side_grid == grid).all()
+    assert all(unit.cell == simulator.earth_map[unit.cell.row][unit.cell.col]
+               for unit in simulator.units)
+
+
+def test_move_to_a_taken_cell_becomes_a_hold(battle):
+    simulator = battle(units_per_side=2)
+    first, second = simulator.sides[0].units
+
+    assert first.apply(Intent(first.id, MOVE_ACTION, 1, 1)) == UnitMoved(first.id, 1, 1)
+    assert second.apply(Intent(second.id, MOVE_ACTION, 1, 1)) == UnitHeld(second.id)
+    assert second.cell.row == 0
+
+
+def test_units_that_redefine_turn_cannot_play_simultaneous_turns(battle):
+    from src.core import LandUnit
+
+    class Talkative(LandUnit):
+        def turn(self):
+            return LandUnit.turn(self)
+
+    scenario = battle()
+    scenario.units[0].__class__ = Talkative
+    with pytest.raises(Exception):
+        Simulator(scenario.earth_map, scenario.sides, 5, 1, simultaneous=True)
+    Simulator(scenario.earth_map, scenario.sides, 5, 1)
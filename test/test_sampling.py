@@ -0,0 +1,29 @@
+from collections import namedtuple
+from scipy import stats
+from src.utils.rng import RandomStreams
+from src.core.simulator.sampling import CommonTimeSampler
+
+Unit = namedtuple("Unit", "id")
+UNITS = [Unit(id) for id in range(20000)]
+
+
+def test_times_follow_shifted_beta():
+    times = CommonTimeSampler(RandomStreams(7)).sample(3, UNITS)
+
+    assert ((times >= 3) & (times <= 4)).all()
+    assert stats.kstest(times - 3, stats.beta(1, 3).cdf).pvalue > 0.01
+
+
+def test_same_seed_same_times():
+    a = CommonTimeSampler(RandomStreams(11)).sample(0, UNITS[:50])
+    b = CommonTimeSampler(RandomStreams(11)).sample(0, UNITS[:50])
+
+    assert (a == b).all()
+
+
+def test_time_depends_only_on_the_unit():
+    sampler = CommonTimeSampler(RandomStreams(5))
+    full = sampler.sample(2, UNITS[:10])
+    part = sampler.sample(2, UNITS[7:3:-1])
+
+    assert (part == full[7:3:-1]).all()
@@ -0,0 +1,65 @@
+from src.core.simulator.scheduler import EventScheduler
+
+
+class Dummy:
+    def __init__(self, id, life_points=1):
+        self.id = id
+        self.life_points = life_points
+
+
+def test_pop_in_time_order():
+    scheduler = EventScheduler()
+    units = [Dummy(i) for i in range(4)]
+    for unit, time in zip(units, [0.7, 0.1, 0.5, 0.3]):
+        scheduler.schedule(unit, 0, time)
+
+    popped = []
+    event = scheduler.pop(0)
+    while event is not None:
+        popped.append(event[1].id)
+        event = scheduler.pop(0)
+
+    assert popped == [1, 3, 2, 0]
+
+
+def test_pop_only_current_turn():
+    scheduler = EventScheduler()
+    scheduler.schedule(Dummy(1), 1, 1.2)
+    scheduler.schedule(Dummy(2), 0, 0.9)
+
+    assert scheduler.pop(0)[1].id == 2
+    assert scheduler.pop(0) is None
+    assert scheduler.next_turn() == 1
+
+
+def test_dead_units_dropped_lazily():
+    scheduler = EventScheduler()
+    dead = Dummy(1)
+    scheduler.schedule(dead, 0, 0.1)
+    scheduler.schedule(Dummy(2), 0, 0.2)
+    dead.life_points = 0
+
+    assert scheduler.pop(0)[1].id == 2
+    assert scheduler.pop(0) is None
+
+
+def test_drain_returns_alive_units_in_order():
+    scheduler = EventScheduler()
+    dead = Dummy(1)
+    scheduler.schedule(Dummy(2), 1, 0.1)
+    scheduler.schedule(dead, 0, 0.2)
+    scheduler.schedule(Dummy(3), 0, 0.3)
+    dead.life_points = 0
+
+    assert [unit.id for unit in scheduler.drain()] == [3, 2]
+    assert not scheduler
+
+
+def test_simulation_runs_until_one_side_remains(battle):
+    simulator = battle(turns=200, seed=1)
+    simulator.start()
+
+    alive = {unit.side.id for unit in simulator.units if unit.life_points > 0}
+    assert simulator.no_enemies
+    assert len(alive) == 1
+    assert not simulator.scheduler
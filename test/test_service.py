@@ -0,0 +1,142 @@
+import json
+import pytest
+from multiprocessing import active_children
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from src.core.simulator.replay import read_replay, SPAWN
+from src.service import *
+
+EXAMPLE = "test/examples/ex12.bs"
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WorkerPool(1, timeout=60)
+    yield pool
+    pool.close()
+
+
+def test_job_from_file_and_source(pool):
+    with open(EXAMPLE) as file:
+        source = file.read()
+    by_path = pool.submit(path=EXAMPLE, replay=True)
+    by_source = pool.submit(source=source, output=True)
+
+    result = pool.wait(by_path.job.id, 60).result
+    assert by_path.status == DONE
+    simulation, = result["simulations"]
+    assert [side["id"] for side in simulation["sides"]] == [1, 2]
+    assert (read_replay(result["replays"][0])["action"] == SPAWN).sum() == 4
+    assert result["output"] is None
+
+    result = pool.wait(by_source.job.id, 60).result
+    assert "Simulation Finished!" in result["output"]
+
+
+def test_timeout_restarts_the_worker(pool):
+    state = pool.wait(pool.submit(path="test/examples/ex5.bs", timeout=0.5).job.id, 60)
+    assert state.status == TIMEOUT
+
+    state = pool.wait(pool.submit(path=EXAMPLE).job.id, 60)
+    assert state.status == DONE
+
+
+def test_a_worker_that_died_while_idle_is_replaced():
+    others = set(active_children())
+    pool = WorkerPool(1, timeout=60)
+    try:
+        pool.wait(pool.submit(path=EXAMPLE).job.id, 60)
+        for process in set(active_children()) - others:
+            process.kill()
+            process.join()
+
+        state = pool.wait(pool.submit(path=EXAMPLE).job.id, 60)
+        assert state.status == FAILED
+
+        state = pool.wait(pool.submit(path=EXAMPLE).job.id, 60)
+        assert state.status == DONE
+    finally:
+        pool.close()
+
+
+def test_compile_errors_fail_the_job(pool):
+    state = pool.wait(pool.submit(source="number a = ;").job.id, 60)
+
+    assert state.status == FAILED
+    assert state.error
+
+
+def test_paths_outside_root_or_not_battle_script_are_refused(pool, tmp_path):
+    scenario = tmp_path / "outside.bs"
+    scenario.write_text("")
+    with pytest.raises(ValueError):
+        pool.submit(path=str(scenario))
+    with pytest.raises(ValueError):
+        pool.submit(path="test/../../outside.bs")
+    with pytest.raises(ValueError):
+        pool.submit(path="test/test_service.py")
+
+
+def test_finished_jobs_are_evicted_with_their_replays(tmp_path):
+    pool = WorkerPool(1, timeout=60, directory=str(tmp_path), keep=1)
+    try:
+        first = pool.wait(pool.submit(path=EXAMPLE, replay=True).job.id, 60)
+        assert pool.get(first.job.id) is first
+        assert list(tmp_path.glob(f"{first.job.id}-*.bsrp"))
+
+        second = pool.wait(pool.submit(path=EXAMPLE, replay=True).job.id, 60)
+        assert pool.get(first.job.id) is None
+        assert not list(tmp_path.glob(f"{first.job.id}-*.bsrp"))
+        assert pool.get(second.job.id) is second
+    finally:
+        pool.close()
+
+    pool = WorkerPool(1, timeout=60, directory=str(tmp_path), ttl=0)
+    try:
+        state = pool.wait(pool.submit(path=EXAMPLE, replay=True).job.id, 60)
+        assert pool.get(state.job.id) is None
+        assert not list(tmp_path.glob(f"{state.job.id}-*.bsrp"))
+    finally:
+        pool.close()
+
+
+def test_http_api(pool):
+    server = make_server(pool)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    def post(body):
+        request = Request(f"{url}/jobs", json.dumps(body).encode(),
+                          {"Content-Type": "application/json"})
+        with urlopen(request) as response:
+            return json.load(response)
+
+    try:
+        state = post({"path": EXAMPLE, "replay": True, "wait": True})
+        assert state["status"] == DONE
+        with urlopen(f"{url}/jobs/{state['id']}") as response:
+            assert json.load(response) == state
+        with urlopen(f"{url}/jobs/{state['id']}/replay/0") as response:
+            assert response.read()[:4] == b"BSRP"
+
+        with pytest.raises(HTTPError) as error:
+            post({"replay": True})
+        assert error.value.code == 400
+        with pytest.raises(HTTPError) as error:
+            post({"path": "test/test_service.py", "wait": True})
+        assert error.value.code == 400
+
+        # un formulario de otra pagina no puede enviar pedidos
+        request = Request(f"{url}/jobs", json.dumps({"path": EXAMPLE}).encode(),
+                          {"Content-Type": "text/plain"})
+        with pytest.raises(HTTPError) as error:
+            urlopen(request)
+        assert error.value.code == 415
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{url}/jobs/999")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,55 @@
+import asyncio
+from src.core import MemorySink, ShardedSimulator, UnitStore
+
+
+def actions(simulator):
+    simulator.start()
+    return [event for event in simulator.sink.events if hasattr(event, 'time')]
+
+
+def test_sharded_turns_match_simultaneous_turns(battle):
+    expected = actions(battle(n=16, units_per_side=6, seed=3, turns=25, sink=MemorySink(),
+                              simultaneous=True))
+
+    scenario = battle(n=16, units_per_side=6)
+    sharded = ShardedSimulator(scenario.earth_map, scenario.sides, 25, 1, seed=3, sink=MemorySink(),
+                               shards=3)
+
+    assert actions(sharded) == expected
+    assert sharded.workers == []
+
+
+def test_sharded_turns_with_a_store(battle):
+    expected = actions(battle(seed=5, sink=MemorySink(), simultaneous=True))
+
+    scenario = battle()
+    store = UnitStore()
+    sharded = ShardedSimulator(scenario.earth_map, scenario.sides, 30, 1, seed=5, sink=MemorySink(),
+                               shards=2, store=store)
+
+    assert actions(sharded) == expected
+    assert store["side"].tolist() == [unit.side.id for unit in sharded.units]
+
+
+def test_workers_are_closed_when_streaming_stops(battle):
+    scenario = battle(n=16, units_per_side=6)
+    sharded = ShardedSimulator(scenario.earth_map, scenario.sides, 25, 1, seed=3, sink=MemorySink(),
+                               shards=2)
+
+    turns = sharded.iter_turns()
+    next(turns)
+    assert sharded.workers
+    turns.close()
+    assert sharded.workers == []
+
+    asyncio.run(sharded.run_async())
+    assert sharded.workers == []
+
+
+def test_sharded_simulator_is_a_context_manager(battle):
+    scenario = battle(n=16, units_per_side=6)
+    with ShardedSimulator(scenario.earth_map, scenario.sides, 25, 1, seed=3, sink=MemorySink(),
+                          shards=2) as sharded:
+        sharded.decide(list(sharded.units))
+        assert sharded.workers
+    assert sharded.workers == []
@@ -0,0 +1,26 @@
+def test_alive_index_follows_deaths(battle):
+    simulator = battle(units_per_side=2)
+    s1, s2 = simulator.sides
+    victim = s2.units[0]
+
+    assert s1.no_alive_units == 2 and s2.no_alive_units == 2
+
+    victim.take_damage(10_000)
+
+    assert s2.no_alive_units == 1
+    assert victim not in list(simulator.alive_units())
+    assert simulator.no_alive_sides() == 2
+
+    s2.units[1].take_damage(10_000)
+
+    assert simulator.no_alive_sides() == 1
+
+
+def test_battle_ends_when_one_side_is_left(battle):
+    simulator = battle(seed=4, turns=200)
+    simulator.start()
+
+    alive = [side for side in simulator.sides if any(u.life_points > 0 for u in side)]
+    assert [side.no_alive_units for side in simulator.sides] == [
+        sum(1 for u in side if u.life_points > 0) for side in simulator.sides]
+    assert simulator.no_enemies == (len(alive) <= 1)
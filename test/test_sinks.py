@@ -0,0 +1,75 @@
+from io import StringIO
+from src.core.simulator.events import *
+from src.core.simulator.sinks import *
+
+
+def test_memory_sink_keeps_typed_events(battle):
+    sink = MemorySink()
+    battle(sink=sink).start()
+
+    assert isinstance(sink.events[0], SimulationStarted)
+    assert isinstance(sink.events[1], TurnStarted)
+    actions = [e for e in sink.events if isinstance(e, (UnitMoved, UnitAttacked, UnitHeld))]
+    assert actions and all(e.time is not None for e in actions)
+
+
+def test_text_sink_format():
+    stream = StringIO()
+    sink = TextSink(stream)
+    sink.emit(UnitMoved(1, 2, 3, time=0.5))
+    sink.emit(UnitAttacked(1, 4, 2, 4, time=0.75))
+    sink.emit(UnitHeld(2, time=0.9))
+
+    assert stream.getvalue() == ""
+
+    sink.flush()
+
+    assert stream.getvalue().splitlines() == [
+        "0.5 - Unit 1 moving to cell (2, 3)",
+        "0.75 - Unit 1 attacks Unit 4 in cell (2, 4)",
+        "0.9 - Unit 2 hold position",
+    ]
+
+
+def test_text_sink_flushes_by_blocks():
+    stream = StringIO()
+    sink = TextSink(stream, buffer_size=2)
+    sink.emit(UnitHeld(1, time=0.1))
+    sink.emit(UnitHeld(2, time=0.2))
+
+    assert len(stream.getvalue().splitlines()) == 2
+
+
+def test_console_sink_drops_over_rate():
+    stream = StringIO()
+    sink = ConsoleSink(rate=3, stream=stream)
+    for i in range(50):
+        sink.emit(UnitHeld(i, time=0.0))
+
+    assert len(stream.getvalue().splitlines()) < 50
+    assert sink.dropped > 0
+
+
+def test_turn_events_keep_the_state_of_their_turn(battle):
+    sink = MemorySink()
+    simulator = battle(seed=4, sink=sink)
+    simulator.start()
+
+    first, last = sink.of_type(TurnStarted)[0], sink.of_type(TurnStarted)[-1]
+    assert [unit.life_points for unit in first.units] == [10] * len(simulator.units)
+    assert [unit.life_points for unit in last.units] != [10] * len(simulator.units)
+    assert all(unit.row in (0, 7) for unit in first.units)
+
+
+def test_units_are_copied_only_for_sinks_that_want_them(battle):
+    class Blind(MemorySink):
+        wants_snapshots = False
+
+    blind = Blind()
+    battle(sink=blind).start()
+    assert all(event.units == () for event in blind.of_type(TurnStarted))
+    assert len(blind.of_type(SimulationStarted)[0].units) == 6
+
+    memory = MemorySink()
+    battle(sink=TeeSink(NullSink(), memory)).start()
+    assert all(len(event.units) == 6 for event in memory.of_type(TurnStarted))
@@ -0,0 +1,22 @@
+from src.core import SpatialIndex
+
+
+def test_nearest_enemy_matches_brute_force(battle):
+    simulator = battle(n=12, units_per_side=5, seed=2, turns=4)
+    simulator.start()
+
+    SpatialIndex(simulator.sides).update_enemy_distances()
+    for unit in simulator.alive_units():
+        expected = min(unit.calculate_distance(unit.cell, enemy.cell)
+                       for enemy in simulator.alive_units() if enemy.side != unit.side)
+        assert unit.enemy_distance == expected
+
+
+def test_far_enemies_skip_the_searches(battle):
+    simulator = battle(n=12, units_per_side=2)
+    SpatialIndex(simulator.sides).update_enemy_distances()
+    unit = simulator.sides[0].units[0]
+
+    assert unit.enemy_distance == 11
+    assert unit.enemy_to_attack() is None
+    assert unit.enemy_in_range(simulator.earth_map[1][1]) == (False, None)
@@ -0,0 +1,56 @@
+import copy
+import pickle
+from src.core.objects.store import UnitStore
+from src.core.objects.units import LandUnit
+from src.core.simulator.sinks import MemorySink
+
+
+def test_units_become_views_of_store_rows(battle):
+    store = UnitStore(capacity=2)
+    simulator = battle(units_per_side=3, store=store)
+    unit = simulator.units[1]
+
+    assert len(store) == 6
+    assert isinstance(unit, LandUnit)
+    assert store["life_points"][1] == unit.life_points == 10
+
+    unit.take_damage(20)
+
+    assert store["life_points"][1] == unit.life_points
+    assert store["side"].tolist() == [unit.side.id for unit in simulator.units]
+    assert store["row"][1] == unit.cell.row and store["col"][1] == unit.cell.col
+
+
+def test_store_does_not_change_the_battle(battle):
+    plain = battle(seed=13, sink=MemorySink())
+    plain.start()
+    stored = battle(seed=13, sink=MemorySink(), store=UnitStore())
+    stored.start()
+
+    strip = lambda events: [e for e in events
+                            if not hasattr(e, "units") and not hasattr(e, "sides")]
+    assert strip(stored.sink.events) == strip(plain.sink.events)
+    assert stored.store["life_points"].tolist() == [u.life_points for u in plain.units]
+
+
+def test_views_pickle_as_plain_units(battle):
+    store = UnitStore()
+    simulator = battle(store=store)
+    unit = simulator.units[1]
+    unit.take_damage(3)
+
+    loaded = pickle.loads(pickle.dumps(unit))
+    assert type(loaded) is LandUnit
+    assert "_store" not in loaded.__dict__
+    assert (loaded.id, loaded.life_points, loaded.attack) == \
+        (unit.id, unit.life_points, unit.attack)
+    assert (loaded.cell.row, loaded.cell.col, loaded.side.id) == \
+        (unit.cell.row, unit.cell.col, unit.side.id)
+    assert loaded.cell.bs_object is loaded
+
+    # una copia no comparte la fila del almacen
+    copied = copy.copy(unit)
+    copied.cell = None
+    copied.life_points = 0
+    assert store["row"][1] == unit.cell.row
+    assert store["life_points"][1] == unit.life_points > 0
@@ -0,0 +1,65 @@
+from src.core.simulator.events import *
+from src.core.simulator.sinks import MemorySink
+from src.core.simulator.stream import TurnDelta, TurnRecorder
+
+
+def test_deltas_cover_the_whole_battle(battle):
+    simulator = battle(seed=6, sink=MemorySink())
+    deltas = list(simulator.iter_turns())
+
+    reference = battle(seed=6, sink=MemorySink())
+    reference.start()
+
+    assert [d.turn for d in deltas] == list(range(1, reference.turn + 1))
+    assert [m for d in deltas for m in d.moves] == \
+        [(e.unit, e.row, e.col) for e in reference.sink.of_type(UnitMoved)]
+    assert [a[:2] for d in deltas for a in d.attacks] == \
+        [(e.unit, e.target) for e in reference.sink.of_type(UnitAttacked)]
+    assert [type(e) for e in simulator.sink.events] == [type(e) for e in reference.sink.events]
+
+    dead = sorted(unit.id for unit in reference.units if unit.life_points <= 0)
+    assert sorted(id for d in deltas for id in d.deaths) == dead
+    assert deltas[-1].alive == {side.id: len(side.alive_units) for side in reference.sides}
+
+
+def test_stop_early_and_resume(battle):
+    sink = MemorySink()
+    simulator = battle(seed=6, sink=sink)
+    turns = simulator.iter_turns()
+    for delta in turns:
+        if delta.attacks:
+            break
+    turns.close()
+
+    assert isinstance(delta, TurnDelta)
+    assert simulator.sink is sink
+    assert simulator.turn == delta.turn
+
+    simulator.start()
+    reference = battle(seed=6, sink=MemorySink())
+    reference.start()
+    actions = (UnitMoved, UnitAttacked, UnitHeld)
+    assert [e for e in sink.events if isinstance(e, actions)] == \
+        [e for e in reference.sink.events if isinstance(e, actions)]
+
+
+def test_skipped_turns_come_in_one_delta(battle):
+    simulator = battle(seed=1, turns=20, warp=True, n=30, units_per_side=2)
+    deltas = list(simulator.iter_turns())
+
+    assert any(d.first < d.turn for d in deltas)
+    assert all(a.turn + 1 == b.first for a, b in zip(deltas, deltas[1:]))
+
+
+def test_objects_sharing_a_unit_id_are_not_unit_deaths(battle):
+    simulator = battle(units_per_side=1)
+    unit = simulator.units[0]
+    recorder = TurnRecorder(MemorySink(), simulator.units)
+
+    recorder.emit(UnitAttacked(7, 3, 0, 0, hits=((unit.id, 5.0, 0.0),)))
+    assert recorder.take(1, simulator).deaths == []
+
+    unit.take_damage(10_000)
+    recorder.emit(UnitAttacked(7, unit.id, 0, 0, hits=((unit.id, 10.0, 0.0),)))
+    recorder.emit(UnitAttacked(7, 3, 0, 0, hits=((unit.id, 5.0, 0.0),)))
+    assert recorder.take(2, simulator).deaths == [unit.id]
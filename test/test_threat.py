@@ -0,0 +1,38 @@
+from numpy import zeros
+
+
+def brute_force(simulator, side):
+    land_map = simulator.earth_map
+    grid = zeros((land_map.no_rows, land_map.no_columns), int)
+    for enemy in simulator.alive_units():
+        if enemy.side == side:
+            continue
+        for i in range(land_map.no_rows):
+            for j in range(land_map.no_columns):
+                d = max(abs(i - enemy.cell.row), abs(j - enemy.cell.col))
+                if enemy.min_range <= d <= enemy.max_range:
+                    grid[i, j] += 1
+    return grid
+
+
+def test_threat_map_is_kept_incrementally(battle):
+    simulator = battle(n=9, units_per_side=3, seed=6, turns=6)
+    simulator.start()
+
+    for side in simulator.sides:
+        assert (side.threat_map.grid == brute_force(simulator, side)).all()
+
+
+def test_threat_map_answers_in_range_of_enemy(battle):
+    simulator = battle(n=9, units_per_side=3)
+    unit = simulator.sides[0].units[1]
+    land_map = simulator.earth_map
+    side = unit.side
+
+    for row in range(land_map.no_rows):
+        for cell in land_map[row]:
+            if cell.bs_object is None:
+                fast = unit.in_range_of_enemy(cell)
+                side.threat_map, saved = None, side.threat_map
+                assert fast == unit.in_range_of_enemy(cell)
+                side.threat_map = saved
@@ -0,0 +1,27 @@
+from src.core import MemorySink, TurnsWarped, TurnStarted, free_turns
+
+
+def test_distant_armies_are_fast_forwarded(battle):
+    simulator = battle(n=40, units_per_side=5, seed=2, turns=30, sink=MemorySink(), warp=True)
+    expected = free_turns(simulator.sides)
+    simulator.start()
+
+    assert expected == (39 - 4 - 6 - 1) // 2
+    warps = simulator.sink.of_type(TurnsWarped)
+    assert warps[0] == TurnsWarped(1, expected)
+    warped = {turn for warp in warps for turn in range(warp.first, warp.last + 1)}
+    started = {event.turn for event in simulator.sink.of_type(TurnStarted)}
+    assert not warped & started
+    assert warped | started == set(range(1, 31))
+
+    land_map = simulator.earth_map
+    for unit in simulator.alive_units():
+        assert land_map[unit.cell.row][unit.cell.col].bs_object is unit
+        assert land_map.side_grid[unit.cell.row, unit.cell.col] == unit.side.id
+
+
+def test_no_warp_once_the_armies_are_close(battle):
+    simulator = battle(n=12, units_per_side=5, seed=2, turns=10, sink=MemorySink(), warp=True)
+    simulator.start()
+
+    assert simulator.sink.of_type(TurnsWarped) == []